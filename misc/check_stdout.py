@@ -0,0 +1,94 @@
+#!/usr/bin/python3
+
+"""
+Check that the schedulers provided with SimSo do not write to the standard
+output during a simulation: they should use the diagnostics of the logger
+(``self.sim.logger.diagnostic``) instead of ``print``.
+
+Every scheduler is simulated on a few small systems. The script exits with
+a non-zero status if one of them printed something. The simulations that
+fail for another reason are reported but are not considered here.
+
+Usage: python3 misc/check_stdout.py [scheduler ...]
+"""
+
+import contextlib
+import importlib
+import io
+import os
+import pkgutil
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import simso.schedulers
+from simso.core import Model
+from simso.configuration import Configuration
+from simso.schedulers import get_loaded_schedulers
+
+
+# (periods, wcets, number of processors)
+SYSTEMS = [
+    ([10, 20, 25], [3, 6, 5], 1),
+    ([5, 10, 20, 40, 50], [2, 3, 8, 10, 15], 2),
+    ([5, 10, 25, 40, 50, 20, 10], [2, 3, 10, 12, 20, 6, 4], 3),
+]
+
+# Parameters required by some of the schedulers.
+SCHEDULER_DATA = {'K': 2}
+
+
+def configuration(clas, periods, wcets, nproc):
+    conf = Configuration()
+    conf.duration = 200 * conf.cycles_per_ms
+    conf.scheduler_info.clas = clas
+    conf.scheduler_info.data.update(SCHEDULER_DATA)
+    conf.task_data_fields = {'priority': 'int'}
+    for i, (period, wcet) in enumerate(zip(periods, wcets)):
+        conf.add_task(name="T{}".format(i), identifier=i, period=period,
+                      activation_date=0, wcet=wcet, deadline=period,
+                      data={'priority': i, 'cpu': i % nproc,
+                            'cbs_period': period,
+                            'cbs_deadline': period,
+                            'cbs_maximum_runtime': wcet})
+    for j in range(nproc):
+        conf.add_processor(name="CPU {}".format(j), identifier=j)
+    return conf
+
+
+def main(argv):
+    for _, name, _ in pkgutil.iter_modules(simso.schedulers.__path__):
+        importlib.import_module('simso.schedulers.' + name)
+
+    selected = set(argv[1:])
+    noisy = []
+    for declaration in get_loaded_schedulers():
+        name = declaration['name'].split('.')[-1]
+        if selected and name not in selected:
+            continue
+        for periods, wcets, nproc in SYSTEMS:
+            output = io.StringIO()
+            try:
+                with contextlib.redirect_stdout(output):
+                    model = Model(configuration(declaration['name'], periods,
+                                                wcets, nproc))
+                    model.run_model()
+            except Exception as e:
+                sys.stderr.write("{} ({} processors) failed: {}: {}\n".format(
+                    name, nproc, type(e).__name__, e))
+            if output.getvalue():
+                line = output.getvalue().splitlines()[0]
+                noisy.append(name)
+                print("{} ({} processors) printed: {}".format(
+                    name, nproc, line))
+                break
+
+    if noisy:
+        print("{} scheduler(s) write to the standard output.".format(
+            len(noisy)))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
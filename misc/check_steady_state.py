@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+
+"""
+Check that the results extrapolated from a steady state are those of the
+full simulation.
+
+A few systems are simulated twice, with and without the detection of the
+steady state, by the given schedulers. The metrics of the tasks, of the
+scheduler and of the processors are then compared over several observation
+windows, including windows that start after 0 (up to the earliest date
+allowed with the extrapolated results). The systems whose steady state is
+not detected are reported and not compared. The script exits with a
+non-zero status if the results differ.
+
+Usage: python3 misc/check_steady_state.py [scheduler ...]
+"""
+
+import contextlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from simso.core import Model
+from simso.configuration import Configuration
+
+
+SCHEDULERS = ['EDF', 'RM', 'LLF', 'G_FL', 'EPDF', 'PD2', 'EDF_mono',
+              'Static_EDF', 'CC_EDF']
+
+# (periods, wcets, activation dates, number of processors)
+SYSTEMS = [
+    ([10, 20, 25], [3, 6, 5], [0, 0, 0], 1),
+    ([5, 10, 20, 40, 50], [2, 3, 8, 10, 15], [0, 0, 0, 0, 0], 2),
+    ([5, 10, 20, 40, 50], [2, 3, 8, 10, 15], [0, 1, 0, 1, 0], 2),
+    ([5, 10, 25, 40, 50, 20, 10], [2, 3, 10, 12, 20, 6, 4],
+     [0, 0, 0, 0, 0, 0, 0], 3),
+]
+
+
+def configuration(clas, periods, wcets, activations, nproc):
+    conf = Configuration()
+    conf.duration = 1000 * conf.cycles_per_ms
+    conf.scheduler_info.clas = clas
+    conf.task_data_fields = {'priority': 'int'}
+    for i, (period, wcet, activation) in enumerate(
+            zip(periods, wcets, activations)):
+        conf.add_task(name="T{}".format(i), identifier=i, period=period,
+                      activation_date=activation, wcet=wcet, deadline=period,
+                      data={'priority': i})
+    for j in range(nproc):
+        conf.add_processor(name="CPU {}".format(j), identifier=j)
+    return conf
+
+
+def metrics(results):
+    tasks = {}
+    for task, task_r in results.tasks.items():
+        tasks[task.name] = (
+            task_r.preemption_count, task_r.preemption_inter_count,
+            task_r.migration_count, task_r.task_migration_count,
+            task_r.resumption_count, task_r.abort_count,
+            task_r.exceeded_count,
+            [(job.activation_date, job.end_date, job.computation_time)
+             for job in task_r.jobs])
+    return (tasks, sorted(vars(results.scheduler).items()),
+            [(proc.name, sorted(vars(proc_r).items()))
+             for proc, proc_r in results.processors.items()],
+            results.total_timers)
+
+
+def windows(steady):
+    ms = 1000000
+    starts = [0, ms, steady.origin // 2, steady.origin - 1, steady.origin]
+    return [(w0, 777 * ms) for w0 in sorted(set(starts)) if w0 >= 0]
+
+
+def main(argv):
+    schedulers = argv[1:] or SCHEDULERS
+    failures = 0
+    for name in schedulers:
+        for system, (periods, wcets, activations, nproc) in enumerate(
+                SYSTEMS):
+            models = []
+            for detect in (False, True):
+                conf = configuration('simso.schedulers.' + name, periods,
+                                     wcets, activations, nproc)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    model = Model(conf, detect_steady_state=detect)
+                    model.run_model()
+                models.append(model)
+            full, extrapolated = models
+            steady = extrapolated.steady_state
+            if steady is None or not steady.detected:
+                print("{} (system {}): steady state not detected.".format(
+                    name, system))
+                continue
+            for window in windows(steady):
+                full.results.observation_window = window
+                extrapolated.results.observation_window = window
+                if metrics(full.results) != metrics(extrapolated.results):
+                    failures += 1
+                    print("{} (system {}, window {}): the extrapolated "
+                          "results differ.".format(name, system, window))
+
+    if failures:
+        print("{} difference(s).".format(failures))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -19,9 +19,11 @@ setup(
     ],
     packages=find_packages(),
     install_requires=[
-        'SimPy==2.3.1',
         'numpy>=1.6'
     ],
+    extras_require={
+        'simpy': ['SimPy==2.3.1']
+    },
     long_description="""\
 SimSo is a scheduling simulator for real-time multiprocessor architectures that
 takes into account some scheduling overheads (scheduling decisions, context-
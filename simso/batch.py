@@ -0,0 +1,311 @@
+"""
+Run many simulations in parallel.
+
+The :func:`run` generator spreads a set of :class:`configurations
+<simso.configuration.Configuration>` (or paths to simulation files) over a
+pool of processes and yields a compact :class:`Summary` for each of them::
+
+    from simso.batch import run
+
+    for summary in run(configurations, chunksize=8, timeout=60, seed=1):
+        if summary.ok:
+            print(summary.index, summary.total_exceeded_count)
+        else:
+            print(summary.index, summary.error)
+
+Every simulation is isolated: an exception, a timeout or even a crash of the
+worker process only produces a summary with an error.
+"""
+
+import os
+import random
+import signal
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+from simso.core import Model
+from simso.configuration import Configuration
+
+
+class Summary(object):
+    """
+    Picklable summary of a simulation. The dates and durations are in
+    cycles.
+
+    Attributes:
+        - `index`: Position of the configuration in the input.
+        - `source`: Path of the simulation file, if any.
+        - `seed`: Seed of the random generator for this simulation.
+        - `error`: None, or the reason why the simulation failed.
+        - `elapsed`: Wall-clock time of the simulation in seconds.
+        - `duration`: Duration of the observation window.
+        - `cycles_per_ms`: Number of cycles per millisecond.
+        - `tasks`: Dictionary of metrics for each task name.
+        - `processors`: Dictionary of metrics for each processor name.
+        - `scheduler`: Dictionary of metrics for the scheduler.
+        - `data`: Value returned by the `summarize` function, if any.
+    """
+    def __init__(self, index, source=None, seed=None):
+        self.index = index
+        self.source = source
+        self.seed = seed
+        self.error = None
+        self.elapsed = 0.0
+        self.duration = None
+        self.cycles_per_ms = None
+        self.tasks = {}
+        self.processors = {}
+        self.scheduler = {}
+        self.data = None
+
+    @property
+    def ok(self):
+        """
+        True if the simulation ended without error.
+        """
+        return self.error is None
+
+    @property
+    def total_preemptions(self):
+        return sum(t['preemptions'] for t in self.tasks.values())
+
+    @property
+    def total_migrations(self):
+        return sum(t['migrations'] for t in self.tasks.values())
+
+    @property
+    def total_exceeded_count(self):
+        return sum(t['exceeded'] for t in self.tasks.values())
+
+    def fill(self, model):
+        """
+        Collect the metrics from the :class:`results
+        <simso.core.results.Results>` of the model.
+        """
+        results = model.results
+        self.cycles_per_ms = model.cycles_per_ms
+        if results is None:
+            return
+        self.duration = results.observation_window_duration
+
+        for task, task_r in results.tasks.items():
+            self.tasks[task.name] = {
+                'jobs': task_r.job_count,
+                'preemptions': task_r.preemption_count,
+                'migrations': task_r.migration_count,
+                'task_migrations': task_r.task_migration_count,
+                'resumptions': task_r.resumption_count,
+                'exceeded': task_r.exceeded_count,
+                'aborted': task_r.abort_count,
+                'max_response_time': task_r.max_response_time,
+                'mean_response_time': task_r.mean_response_time,
+            }
+
+        for proc, load, overhead in results.calc_load():
+            proc_r = results.processors[proc]
+            self.processors[proc.name] = {
+                'load': load,
+                'overhead': overhead,
+                'context_save_count': proc_r.context_save_count,
+                'context_save_overhead': proc_r.context_save_overhead,
+                'context_load_count': proc_r.context_load_count,
+                'context_load_overhead': proc_r.context_load_overhead,
+                'timers': results.timers[proc],
+            }
+
+        self.scheduler = dict(vars(results.scheduler))
+
+
+class Timeout(Exception):
+    """
+    Raised in a worker when a simulation exceeds its time limit.
+    """
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise Timeout()
+
+
+def _simulate(index, source, seed, timeout, summarize, model_kwargs):
+    summary = Summary(index, source if isinstance(source, str) else None,
+                      seed)
+    start = time.time()
+    # The time limit relies on SIGALRM, which is not available everywhere.
+    alarm = timeout and hasattr(signal, 'setitimer')
+    try:
+        if alarm:
+            previous = signal.signal(signal.SIGALRM, _on_alarm)
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        try:
+            if seed is not None:
+                random.seed(seed)
+            if isinstance(source, str):
+                configuration = Configuration(source)
+            else:
+                configuration = source
+            configuration.check_all()
+            model = Model(configuration, **model_kwargs)
+            model.run_model()
+            summary.fill(model)
+            if summarize:
+                summary.data = summarize(model)
+        finally:
+            if alarm:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+                signal.signal(signal.SIGALRM, previous)
+    except Timeout:
+        summary.error = "Timeout after {} s".format(timeout)
+    except Exception:
+        summary.error = traceback.format_exc()
+    summary.elapsed = time.time() - start
+    return summary
+
+
+def _simulate_chunk(chunk, timeout, summarize, model_kwargs):
+    return [_simulate(index, source, seed, timeout, summarize, model_kwargs)
+            for index, source, seed in chunk]
+
+
+def _chunks(configurations, chunksize, seed):
+    chunk = []
+    for index, source in enumerate(configurations):
+        chunk.append((index, source,
+                      None if seed is None else seed + index))
+        if len(chunk) == chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _failed(item, error):
+    index, source, seed = item
+    summary = Summary(index, source if isinstance(source, str) else None,
+                      seed)
+    summary.error = error
+    return summary
+
+
+def run(configurations, max_workers=None, chunksize=1, ordered=True,
+        timeout=None, seed=None, summarize=None, **model_kwargs):
+    """
+    Simulate the configurations in a pool of processes and yield a
+    :class:`Summary` for each of them.
+
+    Args:
+        - `configurations`: Iterable of :class:`Configuration \
+            <simso.configuration.Configuration>` objects or paths to \
+            simulation files. It is consumed lazily.
+        - `max_workers`: Number of processes (default: number of CPUs).
+        - `chunksize`: Number of simulations sent to a worker at once.
+        - `ordered`: If True, the summaries are yielded in the order of the \
+            configurations, otherwise as soon as they are available.
+        - `timeout`: Time limit in seconds for each simulation.
+        - `seed`: If given, the random generator is seeded with \
+            `seed + index` before each simulation, which makes the results \
+            independent of the scheduling of the workers.
+        - `summarize`: Optional picklable function called with the \
+            :class:`Model <simso.core.Model.Model>` in the worker. Its \
+            return value is stored in :attr:`Summary.data`.
+
+    The other keyword arguments are passed to the :class:`Model \
+    <simso.core.Model.Model>`.
+
+    If a worker process dies, the simulations that were running in the pool
+    are run again, each one alone, so that only the culprit is reported as
+    crashed. At most twice as many chunks as workers are submitted ahead of
+    the next summary to yield, which also bounds the summaries kept when
+    they are ordered.
+    """
+    chunks = _chunks(configurations, chunksize, seed)
+    args = (timeout, summarize, model_kwargs)
+
+    max_workers = max_workers or os.cpu_count() or 1
+    max_in_flight = 2 * max_workers
+    pool = ProcessPoolExecutor(max_workers)
+    # Simulations that were running when a pool broke, to be run alone.
+    suspects = deque()
+    quarantine = None
+    running = {}
+    buffered = {}
+    next_index = 0
+    submitted = 0
+    exhausted = False
+
+    def in_flight():
+        # In order, the chunks count until all their summaries are yielded.
+        if ordered:
+            return submitted - next_index // chunksize
+        return len(running)
+
+    try:
+        while True:
+            while not exhausted and in_flight() < max_in_flight:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                else:
+                    running[pool.submit(_simulate_chunk, chunk, *args)] = \
+                        (chunk, False)
+                    submitted += 1
+
+            if suspects and quarantine is None:
+                chunk = [suspects.popleft()]
+                quarantine = ProcessPoolExecutor(1)
+                running[quarantine.submit(_simulate_chunk, chunk, *args)] = \
+                    (chunk, True)
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            summaries = []
+            broken = False
+            for future in done:
+                chunk, isolated = running.pop(future)
+                try:
+                    summaries.extend(future.result())
+                except BrokenProcessPool:
+                    if isolated:
+                        summaries.append(_failed(
+                            chunk[0], "The worker process crashed."))
+                    else:
+                        suspects.extend(chunk)
+                        broken = True
+                except Exception:
+                    # E.g. a configuration or a summary that cannot be
+                    # pickled.
+                    error = traceback.format_exc()
+                    summaries.extend(_failed(item, error) for item in chunk)
+                if isolated:
+                    quarantine.shutdown()
+                    quarantine = None
+
+            if broken:
+                # Every simulation of the broken pool is a suspect.
+                for future, (chunk, isolated) in list(running.items()):
+                    if not isolated:
+                        del running[future]
+                        suspects.extend(chunk)
+                pool.shutdown(wait=False)
+                pool = ProcessPoolExecutor(max_workers)
+
+            if ordered:
+                for summary in summaries:
+                    buffered[summary.index] = summary
+                while next_index in buffered:
+                    yield buffered.pop(next_index)
+                    next_index += 1
+            else:
+                for summary in summaries:
+                    yield summary
+    finally:
+        for future in running:
+            future.cancel()
+        pool.shutdown(wait=False)
+        if quarantine is not None:
+            quarantine.shutdown(wait=False)
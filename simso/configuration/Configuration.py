@@ -3,11 +3,14 @@
 
 import os
 import re
+from functools import reduce
 from xml.dom import minidom
 from simso.core.Scheduler import SchedulerInfo
 from simso.core import Scheduler
 from simso.core.Task import TaskInfo
 from simso.core.Processor import ProcInfo
+from simso.core.Trace import TRACES
+from simso.core.etm.Measured import MODES
 
 from .GenerateConfiguration import generate
 from .parser import Parser
@@ -20,7 +23,10 @@ if not hasattr(minidom.NamedNodeMap, '__contains__'):
 
 def _gcd(*numbers):
     """Return the greatest common divisor of the given integers"""
-    from fractions import gcd
+    try:
+        from math import gcd
+    except ImportError:  # Python 2
+        from fractions import gcd
     return reduce(gcd, numbers)
 
 
@@ -57,6 +63,10 @@ class Configuration(object):
             self._scheduler_info = parser.scheduler_info
             self.penalty_preemption = parser.penalty_preemption
             self.penalty_migration = parser.penalty_migration
+            self.trace = parser.trace
+            self.seed = parser.seed
+            self.execution_times_file = parser.execution_times_file
+            self.execution_times_mode = parser.execution_times_mode
         else:
             self.etm = "wcet"
             self.duration = 100000000
@@ -70,6 +80,10 @@ class Configuration(object):
             self.proc_data_fields = {}
             self.memory_access_time = 100
             self._scheduler_info = SchedulerInfo()
+            self.trace = set(TRACES)
+            self.seed = None
+            self.execution_times_file = None
+            self.execution_times_mode = 'wrap'
         self.calc_penalty_cache()
         self._set_filename(filename)
 
@@ -128,6 +142,18 @@ class Configuration(object):
             "Cycles / ms must be a positive number."
         assert self.memory_access_time >= 0, \
             "The memory access time must be a positive number."
+        assert set(self.trace) <= TRACES, \
+            "Unknown trace: {}.".format(
+                ", ".join(sorted(set(self.trace) - TRACES)))
+        assert self.seed is None or 0 <= self.seed < 2 ** 32, \
+            "The seed must be an integer between 0 and 2**32 - 1."
+        if self.etm == "measured":
+            assert self.execution_times_file and \
+                os.path.isfile(self.execution_times_file), \
+                "The measured execution times need a file."
+            assert self.execution_times_mode in MODES, \
+                "Unknown execution times mode: {}.".format(
+                    self.execution_times_mode)
 
     def check_scheduler(self):
         cls = self._scheduler_info.get_cls()
@@ -236,9 +262,11 @@ class Configuration(object):
 
     def get_hyperperiod(self):
         """
-        Compute and return the hyperperiod of the tasks.
+        Compute and return the hyperperiod of the tasks in milliseconds. The
+        periods are rounded to the cycle, like during the simulation.
         """
-        return _lcm([x.period for x in self.task_info_list])
+        return float(_lcm([int(x.period * self.cycles_per_ms)
+                           for x in self.task_info_list])) / self.cycles_per_ms
 
     @property
     def duration_ms(self):
@@ -6,6 +6,8 @@ from xml.etree import ElementTree
 from xml.dom import minidom
 import os
 
+from simso.core.Trace import TRACES
+
 
 def prettify(elem):
     """Return a pretty-printed XML string for the Element.
@@ -22,6 +24,15 @@ def generate(configuration):
     attrs = {'duration': str(int(configuration.duration)),
              'cycles_per_ms': str(configuration.cycles_per_ms),
              'etm': str(configuration.etm)}
+    if set(configuration.trace) != TRACES:
+        attrs['trace'] = ','.join(sorted(configuration.trace))
+    if configuration.seed is not None:
+        attrs['seed'] = str(configuration.seed)
+    if configuration.execution_times_file:
+        attrs['execution_times'] = os.path.relpath(
+            configuration.execution_times_file, configuration.cur_dir)
+    if configuration.execution_times_mode != 'wrap':
+        attrs['execution_times_mode'] = configuration.execution_times_mode
     top = Element('simulation', attrs)
 
     generate_sched(configuration, top, configuration.scheduler_info)
@@ -6,6 +6,7 @@ from simso.core.Task import TaskInfo, task_types
 from simso.core.Processor import ProcInfo
 from simso.core.Caches import Cache_LRU
 from simso.core.Scheduler import SchedulerInfo
+from simso.core.Trace import TRACES
 
 
 convert_function = {
@@ -34,6 +35,9 @@ class Parser(object):
         self._parse_processors()
         self._parse_scheduler()
         self._parse_penalty()
+        self._parse_trace()
+        self._parse_seed()
+        self._parse_execution_times()
 
     def _parse_caches(self):
         self.caches_list = []
@@ -201,6 +205,34 @@ class Parser(object):
         else:
             self.penalty_migration = 100000
 
+    def _parse_trace(self):
+        simulation = self._dom.getElementsByTagName('simulation')[0]
+        if 'trace' in simulation.attributes:
+            value = simulation.attributes['trace'].value
+            self.trace = set(name for name in value.split(',') if name)
+        else:
+            self.trace = set(TRACES)
+
+    def _parse_seed(self):
+        simulation = self._dom.getElementsByTagName('simulation')[0]
+        if 'seed' in simulation.attributes:
+            self.seed = int(simulation.attributes['seed'].value)
+        else:
+            self.seed = None
+
+    def _parse_execution_times(self):
+        simulation = self._dom.getElementsByTagName('simulation')[0]
+        if 'execution_times' in simulation.attributes:
+            self.execution_times_file = os.path.join(
+                self.cur_dir, simulation.attributes['execution_times'].value)
+        else:
+            self.execution_times_file = None
+        if 'execution_times_mode' in simulation.attributes:
+            self.execution_times_mode = \
+                simulation.attributes['execution_times_mode'].value
+        else:
+            self.execution_times_mode = 'wrap'
+
     def _parse_cycles_per_ms(self):
         simulation = self._dom.getElementsByTagName('simulation')[0]
         if 'cycles_per_ms' in simulation.attributes:
@@ -1,20 +1,78 @@
 # coding=utf-8
 
+import os
+
+import numpy as np
+
+# Profiles already loaded, by file (path, modification date and size).
+_profiles = {}
+
 
 class CSDP(object):
-    def __init__(self, stack):
-        self._csdp = [0]
-        c = 0
-        s = 0.0
-        for dist, value in stack.items():
-            while c < dist:
-                self._csdp.append(s)
-                c += 1
-            s += value
-        self._csdp.append(s)
+    """
+    Accumulated Stack Distance Profile: the value for a distance `d` is the
+    fraction of the memory accesses whose stack distance is lower than `d`,
+    that is the hit rate of an LRU cache of `d` lines.
+
+    The profile is a NumPy array, which can be memory-mapped from a ``.npy``
+    file (see :meth:`load` and :meth:`save`).
+    """
+    def __init__(self, stack=None, csdp=None):
+        """
+        Args:
+            - `stack`: The stack distance profile, as a dictionary whose \
+                keys are the distances and the values their frequencies.
+            - `csdp`: The accumulated profile, as an array (used instead of \
+                `stack`).
+        """
+        if csdp is None:
+            distances = np.array(sorted(stack), dtype=np.int64)
+            frequencies = np.array([stack[d] for d in distances], dtype=float)
+            csdp = CSDP._accumulate(distances, frequencies)
+        self._csdp = csdp
+        self._size = len(csdp)
+        self._last = float(csdp[-1])
+
+    @staticmethod
+    def _accumulate(distances, frequencies):
+        counts = np.zeros(distances.max() + 1 if len(distances) else 0)
+        np.add.at(counts, distances, frequencies)
+        return np.concatenate(([0.0], np.cumsum(counts)))
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Return the profile of a file: either a text file with one distance
+        and its frequency per line, or a ``.npy`` file written by
+        :meth:`save`, which is memory-mapped. The profiles are kept, so that
+        the tasks that use the same file share it.
+        """
+        stat = os.stat(filename)
+        key = (os.path.realpath(filename), stat.st_mtime, stat.st_size)
+        if key not in _profiles:
+            if filename.endswith('.npy'):
+                profile = cls(csdp=np.load(filename, mmap_mode='r'))
+            else:
+                data = np.loadtxt(filename, ndmin=2).reshape(-1, 2)
+                profile = cls(csdp=cls._accumulate(
+                    data[:, 0].astype(np.int64), data[:, 1]))
+            _profiles[key] = profile
+        return _profiles[key]
+
+    def save(self, filename):
+        """
+        Write the profile to a ``.npy`` file, which can be given to
+        :meth:`load`.
+        """
+        np.save(filename, np.asarray(self._csdp))
 
     def get(self, dist):
-        if dist < len(self._csdp):
-            return self._csdp[dist]
-        else:
-            return self._csdp[-1]
+        """
+        Value of the profile for a distance, or for an array of distances
+        (the result is then an array).
+        """
+        if isinstance(dist, int):
+            if dist < self._size:
+                return self._csdp.item(dist)
+            return self._last
+        return self._csdp[np.minimum(dist, self._size - 1)]
@@ -1,3 +1,6 @@
+from collections import OrderedDict
+
+
 class Cache(object):
     def __init__(self, name, identifier, size, associativity, access_time):
         self.name = name
@@ -14,27 +17,37 @@ class Cache(object):
 
 
 class Cache_LRU(Cache):
+    """
+    LRU cache shared by several tasks: the lines used by each task, from
+    the least recently updated task to the most recently updated one, and
+    their total. Updating a task and reading its lines take a constant
+    time (amortized for the evictions).
+    """
     def __init__(self, name, identifier, size, associativity, access_time):
         Cache.__init__(self, name, identifier, size, associativity, access_time)
         self._groups = None
+        self._used_lines = 0
 
     def init(self):
         Cache.init(self)
-        self._groups = []
+        self._groups = OrderedDict()
+        self._used_lines = 0
 
     def update(self, task, lines):
-        self._groups = [x for x in self._groups if x[0] != task]
-        self._groups.append([task, lines])
-
-        usedlines = sum([x[1] for x in self._groups])
-
-        while usedlines > self.size:
-            if self._groups[0][1] <= usedlines - self.size:
-                usedlines -= self._groups.pop(0)[1]
+        self._used_lines -= self._groups.pop(task, 0)
+        self._groups[task] = lines
+        self._used_lines += lines
+
+        # Evict the lines of the least recently updated tasks.
+        while self._used_lines > self.size:
+            oldest, oldest_lines = next(iter(self._groups.items()))
+            excess = self._used_lines - self.size
+            if oldest_lines <= excess:
+                del self._groups[oldest]
+                self._used_lines -= oldest_lines
             else:
-                self._groups[0][1] -= usedlines - self.size
-                usedlines = self.size
+                self._groups[oldest] = oldest_lines - excess
+                self._used_lines = self.size
 
     def get_lines(self, task):
-        groups = [x for x in self._groups if x[0] == task]
-        return groups and groups[0][1] or 0
+        return self._groups.get(task, 0)
@@ -0,0 +1,58 @@
+# coding=utf-8
+
+
+class DeadlineSupervisor(object):
+    """
+    Abort the jobs that are still running when their deadline is reached,
+    for the tasks that abort on a miss.
+
+    Each supervised job has a single entry in the agenda of the :mod:`kernel
+    <simso.core.kernel>`, which is cancelled as soon as the job ends. A job
+    that finishes in time thus never causes an event at its deadline. The
+    deadline misses of the other tasks do not need any event: they are
+    computed from the end dates of the jobs.
+
+    The entries are posted by one event at the end of the current date, for
+    all the jobs released at that date, so that the deadlines are handled
+    after the other events of the same date, as a timer would.
+    """
+    def __init__(self, sim):
+        """
+        Args:
+            - `sim`: The :class:`model <simso.core.Model.Model>` object.
+        """
+        self._sim = sim
+        self._pending = []
+        self._arming = None
+        self._events = {}
+
+    def watch(self, job, delay):
+        """
+        Abort the job if it is still running after `delay` cycles.
+        """
+        self._pending.append((job, delay))
+        if self._arming is None:
+            self._arming = self._sim.kernel.schedule(
+                0, DeadlineSupervisor._arm, (self,))
+
+    def release(self, job):
+        """
+        Stop supervising the job. Called when it ends.
+        """
+        event = self._events.pop(job, None)
+        if event is not None:
+            self._sim.kernel.unschedule(event)
+
+    def _arm(self):
+        kernel = self._sim.kernel
+        pending = self._pending
+        self._pending = []
+        self._arming = None
+        for job, delay in pending:
+            if job.is_active():
+                self._events[job] = kernel.schedule(
+                    delay, DeadlineSupervisor._expire, (self, job))
+
+    def _expire(self, job):
+        del self._events[job]
+        job.task._job_killer(job)
@@ -1,13 +1,37 @@
 # coding=utf-8
 
-from SimPy.Simulation import Process, hold, passivate
 from simso.core.JobEvent import JobEvent
+from simso.core.Logger import DEBUG, WARNING, JOB_ACTIVATED, JOB_EXECUTING, \
+    JOB_PREEMPTED, JOB_TERMINATED, JOB_ABORTED
 from math import ceil
 
+# Steps of the execution of a job.
+STARTING = 0
+WAITING = 1
+EXECUTING = 2
+DONE = 3
 
-class Job(Process):
+
+class Job(object):
     """The Job class simulate the behavior of a real Job. This *should* only be
-    instantiated by a Task."""
+    instantiated by a Task.
+
+    A job is not a :class:`process <simso.core.kernel.Process.Process>`: it is
+    a small record whose execution is driven by its task and its processor.
+    Each step of the execution (activation, start or end of an execution
+    slot, interruption) is an event posted to the :mod:`kernel
+    <simso.core.kernel>`. The attributes of the job are slots; the other
+    attributes that a scheduler may set (e.g. a priority) are stored in a
+    dictionary that is only created when needed."""
+
+    __slots__ = (
+        'name', 'sim', '_task', '_pred', 'instr_count', '_computation_time',
+        '_last_exec', '_n_instr', '_start_date', '_end_date', '_is_preempted',
+        '_activation_date_cycles', '_absolute_deadline_cycles', '_aborted',
+        '_monitor',
+        '_etm', '_was_running_on', 'context_ok', '_state', '_event',
+        '_next_time', '_in_interrupt', '_interrupt_left', '_number',
+        '__dict__')
 
     def __init__(self, task, name, pred, monitor, etm, sim):
         """
@@ -16,18 +40,20 @@ class Job(Process):
             - `name`: The name for this job.
             - `pred`: If the task is not periodic, pred is the job that \
             released this one.
-            - `monitor`: A monitor is an object that log in time.
+            - `monitor`: The :class:`trace <simso.core.Trace.JobTrace>` of \
+            the task.
             - `etm`: The execution time model.
             - `sim`: :class:`Model <simso.core.Model>` instance.
 
         :type task: GenericTask
         :type name: str
         :type pred: bool
-        :type monitor: Monitor
+        :type monitor: JobTrace
         :type etm: AbstractExecutionTimeModel
         :type sim: Model
         """
-        Process.__init__(self, name=name, sim=sim)
+        self.name = name
+        self.sim = sim
         self._task = task
         self._pred = pred
         self.instr_count = 0  # Updated by the cache model.
@@ -37,13 +63,22 @@ class Job(Process):
         self._start_date = None
         self._end_date = None
         self._is_preempted = False
-        self._activation_date = self.sim.now_ms()
-        self._absolute_deadline = self.sim.now_ms() + task.deadline
+        self._activation_date_cycles = sim.now()
+        self._absolute_deadline_cycles = sim.now() + int(
+            task.deadline * sim.cycles_per_ms)
         self._aborted = False
-        self._sim = sim
         self._monitor = monitor
         self._etm = etm
         self._was_running_on = task.cpu
+        self._state = STARTING
+        self._event = None
+        self._next_time = None
+        self._in_interrupt = False
+        self._interrupt_left = 0
+        # Number of the job in its task, as in its name.
+        self._number = task._job_count
+        if sim.traced_jobs is not None:
+            sim.traced_jobs[(task._internal_id, self._number)] = self
 
         self._on_activate()
 
@@ -56,8 +91,10 @@ class Job(Process):
         return self._end_date is None
 
     def _on_activate(self):
-        self._monitor.observe(JobEvent(self, JobEvent.ACTIVATE))
-        self._sim.logger.log(self.name + " Activated.", kernel=True)
+        if self._monitor.enabled:
+            self._monitor.record(JobEvent.ACTIVATE, self)
+        if self.sim.logger.debug_enabled:
+            self.sim.logger.event(DEBUG, JOB_ACTIVATED, self.name)
         self._etm.on_activate(self)
 
     def _on_execute(self):
@@ -69,9 +106,11 @@ class Job(Process):
 
         self.cpu.was_running = self
 
-        self._monitor.observe(JobEvent(self, JobEvent.EXECUTE, self.cpu))
-        self._sim.logger.log("{} Executing on {}".format(
-            self.name, self._task.cpu.name), kernel=True)
+        if self._monitor.enabled:
+            self._monitor.record(JobEvent.EXECUTE, self, self.cpu)
+        if self.sim.logger.debug_enabled:
+            self.sim.logger.event(DEBUG, JOB_EXECUTING, self.name,
+                                  self._task.cpu.name)
 
     def _on_stop_exec(self):
         if self._last_exec is not None:
@@ -84,29 +123,35 @@ class Job(Process):
         self._is_preempted = True
         self._was_running_on = self.cpu
 
-        self._monitor.observe(JobEvent(self, JobEvent.PREEMPTED))
-        self._sim.logger.log(self.name + " Preempted! ret: " +
-                             str(self.interruptLeft), kernel=True)
+        if self._monitor.enabled:
+            self._monitor.record(JobEvent.PREEMPTED, self)
+        if self.sim.logger.debug_enabled:
+            self.sim.logger.event(DEBUG, JOB_PREEMPTED, self.name,
+                                  self._interrupt_left)
 
     def _on_terminated(self):
         self._on_stop_exec()
         self._etm.on_terminated(self)
 
         self._end_date = self.sim.now()
-        self._monitor.observe(JobEvent(self, JobEvent.TERMINATED))
+        if self._monitor.enabled:
+            self._monitor.record(JobEvent.TERMINATED, self)
         self._task.end_job(self)
         self._task.cpu.terminate(self)
-        self._sim.logger.log(self.name + " Terminated.", kernel=True)
+        if self.sim.logger.debug_enabled:
+            self.sim.logger.event(DEBUG, JOB_TERMINATED, self.name)
 
     def _on_abort(self):
         self._on_stop_exec()
         self._etm.on_abort(self)
         self._end_date = self.sim.now()
         self._aborted = True
-        self._monitor.observe(JobEvent(self, JobEvent.ABORTED))
+        if self._monitor.enabled:
+            self._monitor.record(JobEvent.ABORTED, self)
         self._task.end_job(self)
         self._task.cpu.terminate(self)
-        self._sim.logger.log("Job " + str(self.name) + " aborted! ret:" + str(self.ret))
+        if self.sim.logger.warning_enabled:
+            self.sim.logger.event(WARNING, JOB_ABORTED, self.name, self.ret)
 
     def is_running(self):
         """
@@ -140,8 +185,8 @@ class Job(Process):
         True if the end_date is greater than the deadline or if the job was
         aborted.
         """
-        return (self._absolute_deadline * self._sim.cycles_per_ms <
-                self._end_date or self._aborted)
+        return (self._absolute_deadline_cycles < self._end_date or
+                self._aborted)
 
     @property
     def start_date(self):
@@ -161,8 +206,8 @@ class Job(Process):
     @property
     def response_time(self):
         if self._end_date:
-            return (float(self._end_date) / self._sim.cycles_per_ms -
-                    self._activation_date)
+            return (float(self._end_date - self._activation_date_cycles) /
+                    self.sim.cycles_per_ms)
         else:
             return None
 
@@ -173,20 +218,31 @@ class Job(Process):
         """
         return self.wcet - self.actual_computation_time
 
+    @property
+    def ret_cycles(self):
+        """
+        Remaining execution time in cycles.
+        """
+        return (int(self.wcet * self.sim.cycles_per_ms) -
+                self.actual_computation_time_cycles)
+
     @property
     def laxity(self):
         """
-        Dynamic laxity of the job in ms.
+        Dynamic laxity of the job in cycles: the time left before the
+        deadline minus the remaining execution time. It is computed from the
+        dates in cycles, without converting them to milliseconds, so that
+        the jobs with the same laxity compare equal.
         """
-        return (self.absolute_deadline - self.ret
-                ) * self.sim.cycles_per_ms - self.sim.now()
+        return (self._absolute_deadline_cycles - self.ret_cycles -
+                self.sim.now())
 
     @property
     def computation_time(self):
         """
         Time spent executing the job in ms.
         """
-        return float(self.computation_time_cycles) / self._sim.cycles_per_ms
+        return float(self.computation_time_cycles) / self.sim.cycles_per_ms
 
     @property
     def computation_time_cycles(self):
@@ -206,7 +262,7 @@ class Job(Process):
         whole execution.
         """
         return float(
-            self.actual_computation_time_cycles) / self._sim.cycles_per_ms
+            self.actual_computation_time_cycles) / self.sim.cycles_per_ms
 
     @property
     def actual_computation_time_cycles(self):
@@ -250,7 +306,14 @@ class Job(Process):
         """
         Activation date in milliseconds for this job.
         """
-        return self._activation_date
+        return float(self._activation_date_cycles) / self.sim.cycles_per_ms
+
+    @property
+    def activation_date_cycles(self):
+        """
+        Activation date in cycles for this job.
+        """
+        return self._activation_date_cycles
 
     @property
     def absolute_deadline(self):
@@ -258,11 +321,16 @@ class Job(Process):
         Absolute deadline in milliseconds for this job. This is the activation
         date + the relative deadline.
         """
-        return self._absolute_deadline
+        return self._absolute_deadline_cycles / float(self.sim.cycles_per_ms)
 
     @property
     def absolute_deadline_cycles(self):
-        return self._absolute_deadline * self._sim.cycles_per_ms
+        """
+        Absolute deadline in cycles for this job, computed at its activation.
+        The schedulers should prefer it to :attr:`absolute_deadline` in
+        their comparisons.
+        """
+        return self._absolute_deadline_cycles
 
     @property
     def period(self):
@@ -282,35 +350,109 @@ class Job(Process):
         return self._pred
 
     def activate_job(self):
-        self._start_date = self.sim.now()
-        # Notify the OS.
-        self._task.cpu.activate(self)
+        """
+        Start the job at the current date. Called by its task.
+        """
+        if self._state == STARTING and self._next_time is None:
+            self._post(0)
 
-        # While the job's execution is not finished.
-        while self._end_date is None:
-            # Wait an execute order.
-            yield passivate, self
+    def _post(self, delay):
+        self._next_time = self.sim.now() + delay
+        self._event = self.sim.kernel.schedule(delay, Job._step, (self,))
 
-            # Execute the job.
-            if not self.interrupted():
-                self._on_execute()
-                # ret is a duration lower than the remaining execution time.
-                ret = self._etm.get_ret(self)
+    def _cancel(self):
+        """
+        Cancel the pending step of the job.
+        """
+        if self._next_time is not None:
+            if self._event is not None:
+                self.sim.kernel.unschedule(self._event)
+                self._event = None
+            self._next_time = None
 
-                while ret > 0:
-                    yield hold, self, int(ceil(ret))
+    def _reactivate(self):
+        if self._state != DONE:
+            self._cancel()
+            self._post(0)
 
-                    if not self.interrupted():
-                        # If executed without interruption for ret cycles.
-                        ret = self._etm.get_ret(self)
-                    else:
-                        self._on_preempted()
-                        self.interruptReset()
-                        break
+    def _resume(self):
+        """
+        Execute the job on its processor. Called by the processor.
+        """
+        self._in_interrupt = False
+        self._reactivate()
 
-                if ret <= 0:
-                    # End of job.
-                    self._on_terminated()
+    def _interrupt(self):
+        """
+        Interrupt the job if it is executing or about to. Called by the
+        processor.
+        """
+        if self._next_time is not None and not self._in_interrupt:
+            left = self._next_time - self.sim.now()
+            self._interrupt_left = left
+            self._in_interrupt = True
+            self._reactivate()
+            return left
+        return None
 
+    def _interrupted(self):
+        return self._in_interrupt and self._state != DONE
+
+    def _step(self):
+        self._event = None
+        if self._state == STARTING:
+            self._start_date = self.sim.now()
+            # Notify the OS.
+            self._task.cpu.activate(self)
+            self._wait()
+        elif self._state == WAITING:
+            # An execute order was received.
+            if not self._interrupted():
+                self._on_execute()
+                # Predicted end of the job, with the current co-runners.
+                self._execute(self._etm.get_completion(self))
+            else:
+                self._in_interrupt = False
+                self._wait()
+        else:
+            if not self._interrupted():
+                # If executed without interruption until the expected date.
+                self._execute(self._etm.get_completion(self))
             else:
-                self.interruptReset()
+                self._on_preempted()
+                self._in_interrupt = False
+                self._wait()
+
+    def _execute(self, ret):
+        if ret > 0:
+            delay = int(ceil(ret))
+            self._state = EXECUTING
+            self._interrupt_left = delay
+            self._in_interrupt = False
+            self._post(delay)
+        else:
+            # End of job.
+            self._on_terminated()
+            self._wait()
+
+    def _update_completion(self):
+        """
+        Move the end of the current execution slot to the date predicted by
+        the execution time model. Called by the model when its prediction
+        changed.
+        """
+        if self._state == EXECUTING and self._next_time is not None \
+                and not self._in_interrupt:
+            delay = max(0, int(ceil(self._etm.get_completion(self))))
+            if self.sim.now() + delay != self._next_time:
+                self._cancel()
+                self._interrupt_left = delay
+                self._post(delay)
+
+    def _wait(self):
+        # Wait an execute order, unless the job is finished.
+        self._next_time = None
+        if self._end_date is None:
+            self._state = WAITING
+        else:
+            self._state = DONE
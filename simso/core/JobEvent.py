@@ -10,9 +10,11 @@ class JobEvent:
 
     count = 0
 
-    def __init__(self, job, event, cpu=None):
+    def __init__(self, job, event, cpu=None, id_=None):
         self.event = event
         self.job = job
         self.cpu = cpu
-        JobEvent.count += 1
-        self.id_ = JobEvent.count
+        if id_ is None:
+            JobEvent.count += 1
+            id_ = JobEvent.count
+        self.id_ = id_
@@ -1,21 +1,167 @@
 # coding=utf-8
 
-from SimPy.Simulation import Monitor
+from collections import deque
+
+# Levels of the messages. The messages of the kernel (activation, execution
+# and termination of the jobs) are at the DEBUG level, those of the
+# schedulers at the INFO level by default. The DIAGNOSTIC level is for the
+# traces of the schedulers and of the processors while debugging them.
+DIAGNOSTIC = 5
+DEBUG = 10
+INFO = 20
+WARNING = 30
+
+# Event codes. A code is the format of the message, filled with the
+# arguments of the event when the log is read.
+MESSAGE = "{0}"
+JOB_ACTIVATED = "{0} Activated."
+JOB_EXECUTING = "{0} Executing on {1}"
+JOB_PREEMPTED = "{0} Preempted! ret: {1}"
+JOB_TERMINATED = "{0} Terminated."
+JOB_ABORTED = "Job {0} aborted! ret:{1}"
+
+
+def format_record(record):
+    """
+    Return the message of a record and whether it comes from the kernel, as
+    a ``(msg, kernel)`` tuple.
+    """
+    _, level, code, args = record
+    return code.format(*args), level == DEBUG
+
+
+class MemorySink(list):
+    """
+    Keep all the records in memory. This is the default sink.
+    """
+    def emit(self, record):
+        self.append(record)
+
+
+class RingSink(deque):
+    """
+    Keep only the last `size` records in memory.
+    """
+    def __init__(self, size):
+        deque.__init__(self, maxlen=size)
+
+    def emit(self, record):
+        self.append(record)
+
+
+class FileSink(object):
+    """
+    Write the records to a file, one line per message. The records are
+    formatted as they are logged and are not kept in memory.
+    """
+    def __init__(self, file):
+        """
+        Args:
+            - `file`: Path of the file, or file object opened in text mode.
+        """
+        if isinstance(file, str):
+            file = open(file, 'w')
+        self._file = file
+
+    def emit(self, record):
+        msg, _ = format_record(record)
+        self._file.write("{}\t{}\n".format(record[0], msg))
+
+    def close(self):
+        self._file.close()
+
+    def __iter__(self):
+        return iter(())
+
+    def __len__(self):
+        return 0
+
+
+class Logs(object):
+    """
+    Read-only view of the records of a sink, as a sequence of ``[date, (msg,
+    kernel)]`` items like a :class:`Monitor <simso.core.Monitor.Monitor>`.
+    The messages are formatted when they are read.
+    """
+    def __init__(self, sink):
+        self._sink = sink
+
+    @staticmethod
+    def _item(record):
+        return [record[0], format_record(record)]
+
+    def __iter__(self):
+        for record in self._sink:
+            yield self._item(record)
+
+    def __len__(self):
+        return len(self._sink)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._item(record) for record in list(self._sink)[index]]
+        return self._item(self._sink[index])
+
+    def tseries(self):
+        """The series of dates."""
+        return [record[0] for record in self._sink]
+
+    def yseries(self):
+        """The series of ``(msg, kernel)`` values."""
+        return [format_record(record) for record in self._sink]
 
 
 class Logger(object):
     """
-    Simple logger. Every message is logged with its date.
+    Leveled logger. Every message is logged with its date, its level, an
+    event code and the arguments of the event. The message is only
+    formatted when the log is read, and the messages below the level of the
+    logger are dropped: the callers check the `diagnostic_enabled`,
+    `debug_enabled`, `info_enabled` or `warning_enabled` attribute first.
+
+    The diagnostics (see :meth:`diagnostic`) replace the calls to ``print``
+    in the schedulers: they are off unless the level is DIAGNOSTIC.
+
+    The records go to a sink: a :class:`MemorySink` (default), a
+    :class:`RingSink` or a :class:`FileSink`. Any object with an ``emit``
+    method can be used.
     """
-    def __init__(self, sim):
+    def __init__(self, sim, level=DEBUG, sink=None):
         """
         Args:
             - `sim`: The :class:`model <simso.core.Model.Model>` object.
+            - `level`: Minimum level of the messages to keep.
+            - `sink`: Destination of the records.
         """
         self.sim = sim
-        self._logs = Monitor(name="Logs", sim=sim)
+        self.sink = sink if sink is not None else MemorySink()
+        self.level = level
+
+    @property
+    def level(self):
+        """
+        Minimum level of the messages that are kept.
+        """
+        return self._level
+
+    @level.setter
+    def level(self, level):
+        self._level = level
+        self.diagnostic_enabled = level <= DIAGNOSTIC
+        self.debug_enabled = level <= DEBUG
+        self.info_enabled = level <= INFO
+        self.warning_enabled = level <= WARNING
 
-    def log(self, msg, kernel=False):
+    def event(self, level, code, *args):
+        """
+        Log the event `code` with its arguments. The arguments should be
+        plain values (names, numbers) rather than objects, whose state may
+        change before the log is read.
+        """
+        if level >= self._level:
+            self.sink.emit((self.sim.now(), level, code, args))
+
+    def log(self, msg, kernel=False, level=None):
         """
         Log the message `msg`.
 
@@ -23,12 +169,25 @@ class Logger(object):
             - `msg`: The message to log.
             - `kernel`: Allows to make a distinction between a message from \
             the core of the simulation or from the scheduler.
+            - `level`: Level of the message. By default, DEBUG for the \
+            kernel and INFO otherwise.
+        """
+        if level is None:
+            level = DEBUG if kernel else INFO
+        self.event(level, MESSAGE, msg)
+
+    def diagnostic(self, *values):
+        """
+        Log the `values` separated by spaces, as ``print`` would do, at the
+        DIAGNOSTIC level. Nothing is done if that level is disabled.
         """
-        self._logs.observe((msg, kernel))
+        if self.diagnostic_enabled:
+            self.event(DIAGNOSTIC, MESSAGE,
+                       " ".join(str(value) for value in values))
 
     @property
     def logs(self):
         """
-        The logs, a SimPy Monitor object.
+        The logs, a :class:`Logs` view of the records of the sink.
         """
-        return self._logs
+        return Logs(self.sink)
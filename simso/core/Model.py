@@ -1,21 +1,54 @@
 # coding=utf-8
 
-from SimPy.Simulation import Simulation
+import copy
+import io
+import pickle
+import random
+
+from simso.core.kernel import kernels, Signal
+from simso.core.JobEvent import JobEvent
 from simso.core.Processor import Processor
 from simso.core.Task import Task
 from simso.core.Timer import Timer
+from simso.core.DeadlineSupervisor import DeadlineSupervisor
 from simso.core.etm import execution_time_models
-from simso.core.Logger import Logger
-from simso.core.results import Results
+from simso.core.Logger import Logger, DEBUG
+from simso.core.Trace import TRACES, JOBS, PROCESSORS, TracedJob
+from simso.core.results import Results, OnlineResults
+from simso.core.SteadyState import SteadyState
+
+
+class _Pickler(pickle.Pickler):
+    # The model itself is not part of a snapshot: it is the object in which
+    # the snapshot is restored.
+    def __init__(self, file, model):
+        pickle.Pickler.__init__(self, file, pickle.HIGHEST_PROTOCOL)
+        self._model = model
+
+    def persistent_id(self, obj):
+        if obj is self._model:
+            return 'model'
+        return None
+
 
+class _Unpickler(pickle.Unpickler):
+    def __init__(self, file, model):
+        pickle.Unpickler.__init__(self, file)
+        self._model = model
 
-class Model(Simulation):
+    def persistent_load(self, pid):
+        return self._model
+
+
+class Model(object):
     """
     Main class for the simulation. It instantiate the various components
     required by the simulation and run it.
     """
 
-    def __init__(self, configuration, callback=None):
+    def __init__(self, configuration, callback=None, kernel='native',
+                 detect_steady_state=False, log_level=DEBUG, log_sink=None,
+                 trace=None, trace_sink=None, online_results=False):
         """
         Args:
             - `callback`: A callback can be specified. This function will be \
@@ -23,14 +56,71 @@ class Model(Simulation):
                 progression bar).
             - `configuration`: The :class:`configuration \
                 <simso.configuration.Configuration>` of the simulation.
+            - `kernel`: Name of the discrete-event :mod:`kernel \
+                <simso.core.kernel>` to use: "native" (default) or \
+                "simpy" (requires SimPy 2.3.1).
+            - `detect_steady_state`: If True, the simulation is stopped as \
+                soon as the schedule repeats from one hyperperiod to the \
+                next and the results are extrapolated to the duration (see \
+                :class:`SteadyState <simso.core.SteadyState.SteadyState>`). \
+                Only used with periodic tasks, the "wcet" execution time \
+                model and the native kernel; otherwise the whole duration \
+                is simulated.
+            - `log_level`: Minimum level of the messages kept by the \
+                :class:`logger <simso.core.Logger.Logger>`. The messages of \
+                the kernel are at the DEBUG level (default); use INFO to \
+                drop them.
+            - `log_sink`: Destination of the logs (see \
+                :mod:`simso.core.Logger`), in memory by default.
+            - `trace`: The traces to record, among "jobs", "processors", \
+                "scheduler" and "timers" (see :mod:`simso.core.Trace`). \
+                By default, those of the configuration (all of them). \
+                The :class:`results <simso.core.results.Results>` that \
+                depend on a trace that is not recorded are not available.
+            - `trace_sink`: A :class:`TraceFile \
+                <simso.core.Trace.TraceFile>` to write the traces to, so \
+                that their memory stays bounded (the jobs referred to by \
+                the traces are not kept either). By default, the traces \
+                are kept in memory.
+            - `online_results`: If True, the :class:`results \
+                <simso.core.results.OnlineResults>` are computed during \
+                the simulation and the events of the traces are not kept. \
+                The steady state is then not detected.
 
         Methods:
         """
-        Simulation.__init__(self)
-        self._logger = Logger(self)
+        if kernel not in kernels:
+            raise ValueError("Unknown kernel: {}".format(kernel))
+        if trace is None:
+            trace = configuration.trace
+        self.trace = frozenset(trace)
+        if not self.trace <= TRACES:
+            raise ValueError("Unknown trace: {}".format(
+                ", ".join(sorted(self.trace - TRACES))))
+        self._kernel = kernels[kernel]()
+        # Fired when a processor has saved the context of a job.
+        self.context_saved = Signal(self)
+        # Aborts the jobs that miss their deadline.
+        self.deadlines = DeadlineSupervisor(self)
+        if online_results:
+            if trace_sink is not None:
+                raise ValueError("The online results cannot be used with a "
+                                 "trace sink.")
+            trace_sink = OnlineResults(self)
+        self.trace_sink = trace_sink
+        # Jobs referred to by the traces kept in memory, by internal id of
+        # their task and number. With a sink, the jobs are not kept.
+        if trace_sink is None and self.trace & frozenset([JOBS, PROCESSORS]):
+            self.traced_jobs = {}
+        else:
+            self.traced_jobs = None
+        self._online_results = online_results
+        self.logger = Logger(self, log_level, log_sink)
         task_info_list = configuration.task_info_list
         proc_info_list = configuration.proc_info_list
         self._cycles_per_ms = configuration.cycles_per_ms
+        # Seed of the random streams of the execution time models.
+        self.seed = configuration.seed
         self.scheduler = configuration.scheduler_info.instantiate(self)
 
         try:
@@ -61,6 +151,8 @@ class Model(Simulation):
         # XXX: too specific.
         self.penalty_preemption = configuration.penalty_preemption
         self.penalty_migration = configuration.penalty_migration
+        self.execution_times_file = configuration.execution_times_file
+        self.execution_times_mode = configuration.execution_times_mode
 
         self._etm.init()
 
@@ -72,20 +164,51 @@ class Model(Simulation):
         self.scheduler.task_list = self._task_list
         self.scheduler.processors = self._processors
         self.results = None
+        self._started = False
+        self._paused = False
+        self._ended = False
+        self._finished = False
+
+        self.steady_state = None
+        if detect_steady_state and not online_results and \
+                SteadyState.is_applicable(self):
+            self.steady_state = SteadyState(self)
+
+    def now(self):
+        """
+        Current date in cycles.
+        """
+        return self._kernel.now()
 
     def now_ms(self):
-        return float(self.now()) / self._cycles_per_ms
+        return float(self._kernel.now()) / self._cycles_per_ms
+
+    def initialize(self):
+        self._kernel.initialize()
+
+    def activate(self, process, generator, prior=False):
+        """
+        Start the :class:`process <simso.core.kernel.Process.Process>` by
+        running its generator.
+        """
+        self._kernel.activate(process, generator, prior)
+
+    def reactivate(self, process, prior=False):
+        self._kernel.reactivate(process, prior)
 
     @property
-    def logs(self):
+    def kernel(self):
         """
-        All the logs from the :class:`Logger <simso.core.Logger.Logger>`.
+        The discrete-event :mod:`kernel <simso.core.kernel>` in use.
         """
-        return self._logger.logs
+        return self._kernel
 
     @property
-    def logger(self):
-        return self._logger
+    def logs(self):
+        """
+        All the logs from the :class:`Logger <simso.core.Logger.Logger>`.
+        """
+        return self.logger.logs
 
     @property
     def cycles_per_ms(self):
@@ -123,15 +246,38 @@ class Model(Simulation):
         """
         return self._duration
 
+    def traced_job(self, task, number, activation_date_cycles=None):
+        """
+        Job referred to by the traces, from the internal id of its `task`
+        and its `number`. When the model does not keep the jobs, it is a
+        :class:`TracedJob <simso.core.Trace.TracedJob>` (whose activation
+        date can be given).
+        """
+        if self.traced_jobs is not None:
+            return self.traced_jobs[(task, number)]
+        return TracedJob(self._task_list[task], number,
+                         activation_date_cycles)
+
     def _on_tick(self):
         if self._callback:
             self._callback(self.now())
 
-    def run_model(self):
-        """ Execute the simulation."""
+    def start(self):
+        """
+        Initialize the simulation at date 0: the processors, the tasks and
+        the scheduler are started, but no event is handled yet. This is done
+        by the first call to :meth:`run_model`, :meth:`run_until` or
+        :meth:`step`; calling it first allows to start some :class:`timers
+        <simso.core.Timer.Timer>` that will not be lost.
+        """
+        if self._started:
+            return
+        self._started = True
         self.initialize()
         self.scheduler.init()
         self.progress.start()
+        if self.steady_state is not None:
+            self.steady_state.arm()
 
         for cpu in self._processors:
             self.activate(cpu, cpu.run())
@@ -139,11 +285,151 @@ class Model(Simulation):
         for task in self._task_list:
             self.activate(task, task.execute())
 
+    def run_until(self, date):
+        """
+        Handle the events up to `date` (in cycles), included, without going
+        beyond the duration of the simulation. The simulation can then be
+        inspected and continued by another call. Return False when there is
+        nothing left to simulate, True otherwise (including when the
+        simulation was :meth:`paused <pause>`).
+
+        Args:
+            - `date`: Date in cycles.
+        """
+        self.start()
+        if self.at_end:
+            return False
+        self._paused = False
+        until = min(date, self._duration)
+        self._kernel.simulate(until=until)
+        if until == self._duration and not self._paused:
+            self._ended = True
+        return not self.at_end
+
+    def step(self, events=1):
+        """
+        Handle the next `events` events of the simulation, within its
+        duration. Return False when there is nothing left to simulate, True
+        otherwise.
+
+        Args:
+            - `events`: Number of events.
+        """
+        self.start()
+        if self.at_end:
+            return False
+        self._paused = False
+        if not self._kernel.simulate(until=self._duration, events=events) \
+                and not self._paused:
+            self._ended = True
+        return not self.at_end
+
+    @property
+    def at_end(self):
+        """
+        True when the simulation reached its duration, its :class:`steady
+        state <simso.core.SteadyState.SteadyState>`, or was finished.
+        """
+        steady = self.steady_state
+        return (self._ended or self._finished or
+                (steady is not None and steady.detected))
+
+    def finish(self):
+        """
+        End the simulation and compute the :attr:`results`, over the part
+        that was simulated: :meth:`run_until` can be used to stop early, for
+        instance at the first deadline miss. No event can be handled
+        afterwards.
+        """
+        if self._finished:
+            return
+        self._finished = True
+        self._etm.update()
+        if self.trace_sink is not None:
+            self.trace_sink.close()
+
+        if self.now() > 0:
+            if self._online_results:
+                self.results = self.trace_sink
+            else:
+                self.results = Results(self)
+            self.results.end()
+
+    def run_model(self):
+        """
+        Execute the simulation, or what is left of it, and compute the
+        results. If the simulation is :meth:`paused <pause>`, this method
+        returns early and a new call resumes the simulation.
+        """
         try:
-            self.simulate(until=self._duration)
+            self.run_until(self._duration)
         finally:
-            self._etm.update()
+            if self._paused:
+                self._paused = False
+            else:
+                self.finish()
 
-            if self.now() > 0:
-                self.results = Results(self)
-                self.results.end()
+    def pause(self):
+        """
+        Stop the simulation at the end of the current event, for instance
+        from a :class:`timer <simso.core.Timer.Timer>` handler. The call to
+        :meth:`run_model`, :meth:`run_until` or :meth:`step` then returns
+        without analyzing the results, and the model can be checkpointed or
+        forked.
+        """
+        self._paused = True
+        self._kernel.stop()
+
+    def _state(self):
+        if self.trace_sink is not None and not self._online_results:
+            raise TypeError("The traces written to a file cannot be "
+                            "checkpointed.")
+        state = dict(self.__dict__)
+        del state['_callback']
+        return state
+
+    def checkpoint(self):
+        """
+        Return a snapshot of the simulation as a bytes string: the agenda of
+        the kernel, the processors, the tasks and their jobs, the scheduler,
+        the execution time model, the monitors and the state of the random
+        module. The snapshot can be stored and given to :meth:`restore`.
+
+        The model must not be in the middle of an event: it is either not
+        started or :meth:`paused <pause>`. The schedulers and the processes
+        must be picklable (no generator or lambda in their state); this is
+        the case of the ones provided with SimSo. Only the native kernel
+        can be checkpointed, and the traces must be kept in memory.
+        """
+        output = io.BytesIO()
+        _Pickler(output, self).dump(
+            (self._state(), JobEvent.count, random.getstate()))
+        return output.getvalue()
+
+    def restore(self, snapshot):
+        """
+        Replace the state of the model with a snapshot returned by
+        :meth:`checkpoint`, possibly by another model or in another process.
+        The simulation is then resumed by :meth:`run_model`.
+
+        Args:
+            - `snapshot`: The bytes string returned by :meth:`checkpoint`.
+        """
+        state, count, random_state = _Unpickler(
+            io.BytesIO(snapshot), self).load()
+        self.__dict__.update(state)
+        JobEvent.count = max(JobEvent.count, count)
+        random.setstate(random_state)
+
+    def fork(self):
+        """
+        Return an independent copy of the model, which can be run (with
+        :meth:`run_model`), checkpointed or sent to another process. The
+        same restrictions as for :meth:`checkpoint` apply. The copy shares
+        the random module with this model.
+        """
+        model = type(self).__new__(type(self))
+        state = copy.deepcopy(self._state(), {id(self): model})
+        model.__dict__.update(state)
+        model._callback = self._callback
+        return model
@@ -0,0 +1,34 @@
+# coding=utf-8
+
+
+class Monitor(list):
+    """
+    Record of dated observations. A Monitor is a list of ``[date, value]``
+    items, the date being expressed in cycles. It mimics the Monitor class of
+    SimPy 2 that was used before.
+    """
+    def __init__(self, name, sim):
+        """
+        Args:
+            - `name`: Name of the monitor.
+            - `sim`: The :class:`model <simso.core.Model.Model>` object.
+        """
+        list.__init__(self)
+        self.name = name
+        self.sim = sim
+
+    def observe(self, y, t=None):
+        """
+        Record the value `y` at the date `t` (now by default).
+        """
+        if t is None:
+            t = self.sim.now()
+        self.append([t, y])
+
+    def tseries(self):
+        """The series of dates."""
+        return [x[0] for x in self]
+
+    def yseries(self):
+        """The series of values."""
+        return [x[1] for x in self]
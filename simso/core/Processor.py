@@ -1,9 +1,13 @@
 # coding=utf-8
 
 from collections import deque
-from SimPy.Simulation import Process, Monitor, hold, waituntil
-from simso.core.ProcEvent import ProcRunEvent, ProcIdleEvent, \
-    ProcOverheadEvent, ProcCxtSaveEvent, ProcCxtLoadEvent
+from simso.core.kernel import Process, StateMachine, Signal, hold, \
+    waitsignal
+from simso.core.Logger import WARNING
+from simso.core.Trace import ProcessorTrace, TimerTrace, PROCESSORS, \
+    TIMERS, RUN, IDLE, ACTIVATION_OVERHEAD, TERMINATION_OVERHEAD, \
+    SCHEDULING_OVERHEAD, CONTEXT_SAVE, CONTEXT_SAVED, CONTEXT_LOAD, \
+    CONTEXT_LOADED
 
 
 RESCHED = 1
@@ -13,6 +17,19 @@ TIMER = 4
 PREEMPT = 5
 SPEED = 6
 
+# Steps of the behavior of a processor.
+_LOOP = 0
+_CONTEXT_READY = 1
+_CONTEXT_LOADED = 2
+_WOKEN = 3
+_CONTEXT_SAVED = 4
+_HANDLE = 5
+_ACTIVATED = 6
+_TERMINATED = 7
+_TIMER_OVERHEAD = 8
+_LOCKED = 9
+_SCHEDULED = 10
+
 
 class ProcInfo(object):
     def __init__(self, identifier, name, cs_overhead=0, cl_overhead=0,
@@ -61,42 +78,56 @@ class Processor(Process):
         self._running = None
         self.was_running = None
         self._evts = deque([])
+        self._evts_signal = Signal(model)
         self.sched = model.scheduler
-        self.monitor = Monitor(name="Monitor" + proc_info.name, sim=model)
+        self.monitor = ProcessorTrace(name="Monitor" + proc_info.name,
+                                      sim=model,
+                                      enabled=PROCESSORS in model.trace)
         self._caches = []
         self._penalty = proc_info.penalty
         self._cs_overhead = proc_info.cs_overhead
         self._cl_overhead = proc_info.cl_overhead
         self._migration_overhead = proc_info.migration_overhead
         self.set_caches(proc_info.caches)
-        self.timer_monitor = Monitor(name="Monitor Timer" + proc_info.name,
-                                     sim=model)
+        self.timer_monitor = TimerTrace(
+            name="Monitor Timer" + proc_info.name, sim=model,
+            enabled=TIMERS in model.trace)
         self._speed = proc_info.speed
+        self._step = _LOOP
+        self._job = None
+        self._timer = None
+        self._decisions = None
 
     def resched(self):
         """
         Add a resched event to the list of events to handle.
         """
         self._evts.append((RESCHED,))
+        self._evts_signal.fire()
 
     def activate(self, job):
         self._evts.append((ACTIVATE, job))
+        self._evts_signal.fire()
 
     def terminate(self, job):
         self._evts.append((TERMINATE, job))
         self._running = None
+        self._evts_signal.fire()
 
     def preempt(self, job=None):
         self._evts = deque([e for e in self._evts if e[0] != PREEMPT])
         self._evts.append((PREEMPT,))
         self._running = job
+        self._evts_signal.fire()
 
-    def timer(self, timer):
-        self._evts.append((TIMER, timer))
+    def timer(self, timer, generation=None):
+        self._evts.append((TIMER, timer, generation))
+        self._evts_signal.fire()
 
     def set_speed(self, speed):
         assert speed >= 0, "Speed must be positive."
         self._evts.append((SPEED, speed))
+        self._evts_signal.fire()
 
     @property
     def speed(self):
@@ -144,62 +175,134 @@ class Processor(Process):
         return self._running
 
     def run(self):
+        """
+        Behavior of the processor, a :class:`state machine \
+        <simso.core.kernel.Process.StateMachine>`.
+        """
+        self._step = _LOOP
+        return StateMachine(self._next_command)
+
+    def _context_ready(self):
+        return self._job.context_ok
+
+    def _has_events(self):
+        return self._evts
+
+    def _wait_events(self):
+        self._step = _WOKEN
+        return waitsignal, self, self._evts_signal, self._has_events
+
+    def _next_command(self):
+        step = self._step
         while True:
-            if not self._evts:
-                job = self._running
-                if job:
-                    yield waituntil, self, lambda: job.context_ok
-                    self.monitor.observe(ProcCxtLoadEvent())
-                    yield hold, self, self.cl_overhead  # overhead load context
-                    self.monitor.observe(ProcCxtLoadEvent(terminated=True))
-                    job.interruptReset()
-                    self.sim.reactivate(job)
-                    self.monitor.observe(ProcRunEvent(job))
-                    job.context_ok = False
-                else:
-                    self.monitor.observe(ProcIdleEvent())
-
-                # Wait event.
-                yield waituntil, self, lambda: self._evts
-                if job:
-                    self.interrupt(job)
-                    self.monitor.observe(ProcCxtSaveEvent())
-                    yield hold, self, self.cs_overhead  # overhead save context
-                    self.monitor.observe(ProcCxtSaveEvent(terminated=True))
-                    job.context_ok = True
-
-            evt = self._evts.popleft()
-            if evt[0] == RESCHED:
-                if any(x[0] != RESCHED for x in self._evts):
-                    self._evts.append(evt)
+            if step == _LOOP:
+                if self._evts:
+                    step = _HANDLE
                     continue
+                job = self._job = self._running
+                if job:
+                    self._step = _CONTEXT_READY
+                    return (waitsignal, self, self._model.context_saved,
+                            self._context_ready)
+                if self.monitor.enabled:
+                    self.monitor.record(IDLE)
+                return self._wait_events()
+
+            elif step == _CONTEXT_READY:
+                if self.monitor.enabled:
+                    self.monitor.record(CONTEXT_LOAD)
+                self._step = _CONTEXT_LOADED
+                return hold, self, self.cl_overhead  # overhead load context
+
+            elif step == _CONTEXT_LOADED:
+                job = self._job
+                job._resume()
+                if self.monitor.enabled:
+                    self.monitor.record(CONTEXT_LOADED)
+                    self.monitor.record(RUN, job)
+                job.context_ok = False
+                return self._wait_events()
+
+            elif step == _WOKEN:
+                if self._job:
+                    self._job._interrupt()
+                    if self.monitor.enabled:
+                        self.monitor.record(CONTEXT_SAVE)
+                    self._step = _CONTEXT_SAVED
+                    return hold, self, self.cs_overhead  # overhead save context
+                step = _HANDLE
+
+            elif step == _CONTEXT_SAVED:
+                if self.monitor.enabled:
+                    self.monitor.record(CONTEXT_SAVED)
+                self._job.context_ok = True
+                self._model.context_saved.fire()
+                step = _HANDLE
+
+            elif step == _HANDLE:
+                evt = self._evts.popleft()
+                step = _LOOP
+                if evt[0] == RESCHED:
+                    if any(x[0] != RESCHED for x in self._evts):
+                        self._evts.append(evt)
+                        continue
 
-            if evt[0] == ACTIVATE:
-                self.sched.on_activate(evt[1])
-                self.monitor.observe(ProcOverheadEvent("JobActivation"))
-                self.sched.monitor_begin_activate(self)
-                yield hold, self, self.sched.overhead_activate
+                if evt[0] == ACTIVATE:
+                    self.sched.on_activate(evt[1])
+                    if self.monitor.enabled:
+                        self.monitor.record(ACTIVATION_OVERHEAD)
+                    self.sched.monitor_begin_activate(self)
+                    self._step = _ACTIVATED
+                    return hold, self, self.sched.overhead_activate
+                elif evt[0] == TERMINATE:
+                    self.sched.on_terminated(evt[1])
+                    if self.monitor.enabled:
+                        self.monitor.record(TERMINATION_OVERHEAD)
+                    self.sched.monitor_begin_terminate(self)
+                    self._step = _TERMINATED
+                    return hold, self, self.sched.overhead_terminate
+                elif evt[0] == TIMER:
+                    if self.timer_monitor.enabled:
+                        self.timer_monitor.record()
+                    if evt[1].overhead > 0:
+                        self.sim.logger.diagnostic(
+                            self.sim.now(), "hold", evt[1].overhead)
+                        self._timer = evt[1:]
+                        self._step = _TIMER_OVERHEAD
+                        return hold, self, evt[1].overhead
+                    evt[1].call_handler(evt[2])
+                elif evt[0] == SPEED:
+                    self._speed = evt[1]
+                elif evt[0] == RESCHED:
+                    if self.monitor.enabled:
+                        self.monitor.record(SCHEDULING_OVERHEAD)
+                    self.sched.monitor_begin_schedule(self)
+                    self._step = _LOCKED
+                    return (waitsignal, self, self.sched.lock_released,
+                            self.sched.get_lock)
+
+            elif step == _ACTIVATED:
                 self.sched.monitor_end_activate(self)
-            elif evt[0] == TERMINATE:
-                self.sched.on_terminated(evt[1])
-                self.monitor.observe(ProcOverheadEvent("JobTermination"))
-                self.sched.monitor_begin_terminate(self)
-                yield hold, self, self.sched.overhead_terminate
+                step = _LOOP
+
+            elif step == _TERMINATED:
                 self.sched.monitor_end_terminate(self)
-            elif evt[0] == TIMER:
-                self.timer_monitor.observe(None)
-                if evt[1].overhead > 0:
-                    print(self.sim.now(), "hold", evt[1].overhead)
-                    yield hold, self, evt[1].overhead
-                evt[1].call_handler()
-            elif evt[0] == SPEED:
-                self._speed = evt[1]
-            elif evt[0] == RESCHED:
-                self.monitor.observe(ProcOverheadEvent("Scheduling"))
-                self.sched.monitor_begin_schedule(self)
-                yield waituntil, self, self.sched.get_lock
-                decisions = self.sched.schedule(self)
-                yield hold, self, self.sched.overhead  # overhead scheduling
+                step = _LOOP
+
+            elif step == _TIMER_OVERHEAD:
+                timer, generation = self._timer
+                self._timer = None
+                timer.call_handler(generation)
+                step = _LOOP
+
+            elif step == _LOCKED:
+                self._decisions = self.sched.schedule(self)
+                self._step = _SCHEDULED
+                return hold, self, self.sched.overhead  # overhead scheduling
+
+            elif step == _SCHEDULED:
+                decisions = self._decisions
+                self._decisions = None
                 if type(decisions) is not list:
                     decisions = [decisions]
                 decisions = [d for d in decisions if d is not None]
@@ -211,8 +314,9 @@ class Processor(Process):
 
                     # If trying to execute a terminated job, warn and ignore:
                     if job is not None and not job.is_active():
-                        print("Can't schedule a terminated job! ({})"
-                              .format(job.name))
+                        self.sim.logger.log(
+                            "Can't schedule a terminated job! ({})"
+                            .format(job.name), level=WARNING)
                         continue
 
                     # if the job was running somewhere else, stop it.
@@ -226,11 +330,12 @@ class Processor(Process):
                         job.task.cpu = cpu
 
                 # Forbid to run a job simultaneously on 2 or more processors.
-                running_tasks = [
-                    cpu.running.name
+                running_jobs = [
+                    cpu.running
                     for cpu in self._model.processors if cpu.running]
-                assert len(set(running_tasks)) == len(running_tasks), \
+                assert len(set(running_jobs)) == len(running_jobs), \
                     "Try to run a job on 2 processors simultaneously!"
 
                 self.sched.release_lock()
                 self.sched.monitor_end_schedule(self)
+                step = _LOOP
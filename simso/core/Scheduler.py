@@ -5,11 +5,9 @@ import importlib
 import pkgutil
 import inspect
 
-from simso.core.SchedulerEvent import SchedulerBeginScheduleEvent, \
-    SchedulerEndScheduleEvent, SchedulerBeginActivateEvent, \
-    SchedulerEndActivateEvent, SchedulerBeginTerminateEvent, \
-    SchedulerEndTerminateEvent
-from SimPy.Simulation import Monitor
+from simso.core.SchedulerEvent import SchedulerEvent
+from simso.core.Trace import SchedulerTrace, SCHEDULER
+from simso.core.kernel import Signal
 
 
 class SchedulerInfo(object):
@@ -114,7 +112,10 @@ class Scheduler(object):
 
     By default, the scheduler can only run on a single processor at the same
     simulation time. It is also possible to override this behavior by
-    overriding the :meth:`get_lock` and :meth:`release_lock` methods.
+    overriding the :meth:`get_lock` and :meth:`release_lock` methods. The
+    processors waiting for the lock only try to take it again when
+    :attr:`lock_released` is fired, which the default :meth:`release_lock`
+    does.
     """
 
     def __init__(self, sim, scheduler_info, **kwargs):
@@ -145,7 +146,9 @@ class Scheduler(object):
         self.overhead_activate = scheduler_info.overhead_activate
         self.overhead_terminate = scheduler_info.overhead_terminate
         self.data = scheduler_info.data
-        self.monitor = Monitor(name="MonitorScheduler", sim=sim)
+        self.monitor = SchedulerTrace(name="MonitorScheduler", sim=sim,
+                                      enabled=SCHEDULER in sim.trace)
+        self.lock_released = Signal(sim)
 
     def init(self):
         """
@@ -223,24 +226,31 @@ class Scheduler(object):
         Release the lock. Goes in pair with :meth:`get_lock`.
         """
         self._lock = False
+        self.lock_released.fire()
 
     def monitor_begin_schedule(self, cpu):
-        self.monitor.observe(SchedulerBeginScheduleEvent(cpu))
+        if self.monitor.enabled:
+            self.monitor.record(SchedulerEvent.BEGIN_SCHEDULE, None, cpu)
 
     def monitor_end_schedule(self, cpu):
-        self.monitor.observe(SchedulerEndScheduleEvent(cpu))
+        if self.monitor.enabled:
+            self.monitor.record(SchedulerEvent.END_SCHEDULE, None, cpu)
 
     def monitor_begin_activate(self, cpu):
-        self.monitor.observe(SchedulerBeginActivateEvent(cpu))
+        if self.monitor.enabled:
+            self.monitor.record(SchedulerEvent.BEGIN_ACTIVATE, None, cpu)
 
     def monitor_end_activate(self, cpu):
-        self.monitor.observe(SchedulerEndActivateEvent(cpu))
+        if self.monitor.enabled:
+            self.monitor.record(SchedulerEvent.END_ACTIVATE, None, cpu)
 
     def monitor_begin_terminate(self, cpu):
-        self.monitor.observe(SchedulerBeginTerminateEvent(cpu))
+        if self.monitor.enabled:
+            self.monitor.record(SchedulerEvent.BEGIN_TERMINATE, None, cpu)
 
     def monitor_end_terminate(self, cpu):
-        self.monitor.observe(SchedulerEndTerminateEvent(cpu))
+        if self.monitor.enabled:
+            self.monitor.record(SchedulerEvent.END_TERMINATE, None, cpu)
 
 
 def get_schedulers():
@@ -0,0 +1,313 @@
+# coding=utf-8
+
+import types
+from collections import deque
+from fractions import Fraction
+
+from simso.core.kernel import Process, Signal, NativeKernel
+from simso.core.Monitor import Monitor
+from simso.core.Trace import Trace
+from simso.core.Logger import Logger
+from simso.core.Job import Job
+from simso.core.Task import GenericTask, PTask
+from simso.core.Processor import Processor
+from simso.core.Scheduler import Scheduler
+from simso.core.Timer import Timer
+from simso.core.DeadlineSupervisor import DeadlineSupervisor
+from simso.core.etm.WCET import WCET
+from simso.core.etm.AbstractExecutionTimeModel \
+    import AbstractExecutionTimeModel
+
+try:
+    from math import gcd
+except ImportError:  # Python 2
+    from fractions import gcd
+
+
+# Attributes of the processes and timers that are not part of the state:
+# references to the model, history, or values that only matter for the logs.
+_SKIPPED = frozenset([
+    'name', 'sim', '_sim', '_model', '_kernel', 'sched', '_etm', '_rec',
+    '_wait_seq', '_monitor', 'monitor', 'timer_monitor', '_task_info',
+    '_jobs', '_job_count', '_handle', '_event', '_number'])
+
+# Attributes of the processes that hold a date in cycles.
+_CYCLE_DATES = frozenset(['_next_time', '_start_date', '_end_date',
+                          '_last_exec', '_activation_date_cycles',
+                          '_absolute_deadline_cycles'])
+
+# Attributes that are common to all the schedulers and that do not change
+# during the simulation.
+_SCHEDULER_STATIC = frozenset([
+    'sim', 'processors', 'task_list', 'data', 'monitor', 'overhead',
+    'overhead_activate', 'overhead_terminate'])
+
+# Number of snapshots kept for the comparison. The schedule may repeat every
+# few hyperperiods only (e.g. when the jobs alternate between processors).
+_DEPTH = 8
+
+
+def _fields(obj):
+    """
+    Attributes of an object, including its slots.
+    """
+    fields = dict(getattr(obj, '__dict__', ()))
+    for cls in type(obj).__mro__:
+        for name in getattr(cls, '__slots__', ()):
+            if name != '__dict__' and hasattr(obj, name):
+                fields[name] = getattr(obj, name)
+    return fields
+
+
+class SteadyState(object):
+    """
+    Detection of the steady state of a system of synchronous or asynchronous
+    periodic tasks.
+
+    The state of the model (pending jobs with their remaining budgets, the
+    processors, the scheduler, the execution time model and the pending
+    events of the kernel) is captured at every hyperperiod boundary, before
+    any event of that date is handled. Dates are made relative to the
+    boundary and the jobs are identified by their task and their activation
+    date. When a snapshot is equal to one of the previous ones, the schedule
+    repeats from then on and the simulation is stopped. The
+    :class:`Results <simso.core.results.Results>` are then extrapolated to
+    the duration of the simulation.
+
+    Any part of the state that is not periodic (such as an absolute date
+    stored by a scheduler) simply prevents the detection, in which case the
+    whole duration is simulated. The detection is also abandoned when the
+    state keeps growing from one hyperperiod to the next. The state of a
+    scheduler is read from its attributes: a scheduler that keeps some state
+    elsewhere (e.g. in module globals) should not be used with this mode.
+
+    Once detected, the following attributes are set (dates in cycles):
+
+    - `start`: boundary from which the schedule repeats.
+    - `end`: date at which the simulation was stopped.
+    - `period`: period of the schedule (end - start), a multiple of the \
+    hyperperiod.
+    - `origin`: earliest activation date of the jobs that were pending at \
+    `start`.
+    """
+
+    def __init__(self, model):
+        """
+        Args:
+            - `model`: The :class:`model <simso.core.Model.Model>` object.
+        """
+        self._model = model
+        cycles_per_ms = model.cycles_per_ms
+        periods = [int(task.period * cycles_per_ms)
+                   for task in model.task_list]
+        hyperperiod = 1
+        for period in periods:
+            hyperperiod = hyperperiod * period // gcd(hyperperiod, period)
+        self.hyperperiod = hyperperiod
+        self._next_boundary = max(
+            int(task._task_info.activation_date * cycles_per_ms)
+            for task in model.task_list)
+        self._previous = deque(maxlen=_DEPTH)
+        self._sizes = deque(maxlen=_DEPTH)
+        self.start = None
+        self.end = None
+        self.period = None
+        self.origin = None
+
+    @staticmethod
+    def is_applicable(model):
+        """
+        Return True if the steady state of the model can be detected: the
+        tasks are periodic, the execution time model is deterministic
+        ("wcet") and the native kernel is used.
+        """
+        return (isinstance(model.kernel, NativeKernel) and
+                isinstance(model.etm, WCET) and
+                len(model.task_list) > 0 and
+                all(isinstance(task, PTask) and task.period > 0
+                    for task in model.task_list))
+
+    @property
+    def detected(self):
+        """
+        True if the steady state was reached during the simulation.
+        """
+        return self.end is not None
+
+    def arm(self):
+        """
+        Register the first snapshot. Called by the model when the simulation
+        starts.
+        """
+        self._arm_next()
+
+    def _arm_next(self):
+        if self._next_boundary <= self._model.duration:
+            kernel = self._model.kernel
+            kernel.schedule(self._next_boundary - kernel.now(),
+                            self._on_boundary, prior=True)
+
+    def _on_boundary(self):
+        now = self._model.now()
+        state = self.snapshot()
+        for date, previous, origin in reversed(self._previous):
+            if previous == state:
+                self.start = date
+                self.end = now
+                self.period = now - date
+                self.origin = origin
+                self._model.kernel.stop()
+                return
+
+        self._sizes.append(self._size)
+        sizes = list(self._sizes)
+        if len(sizes) == _DEPTH and all(
+                a < b for a, b in zip(sizes, sizes[1:])):
+            # The state is not bounded, give up.
+            return
+
+        self._previous.append((now, state, self._pending_origin(now)))
+        self._next_boundary = now + self.hyperperiod
+        self._arm_next()
+
+    def _pending_origin(self, now):
+        origin = now
+        for task in self._model.task_list:
+            for job in task._activations_fifo:
+                origin = min(origin, job.activation_date_cycles)
+        return origin
+
+    def snapshot(self):
+        """
+        Return a comparable representation of the state of the model at the
+        current date.
+        """
+        model = self._model
+        self._now = model.now()
+        self._visiting = set()
+        self._size = 0
+        self._jobs = {}
+        self._worklist = []
+
+        state = (
+            tuple(self._canon_fields(task) for task in model.task_list),
+            tuple(self._canon_fields(proc) for proc in model.processors),
+            self._canon_scheduler(model.scheduler),
+            self._canon_agenda(),
+            self._canon_etm(),
+        )
+        # The jobs found while walking the state, with their own state.
+        jobs = []
+        while self._worklist:
+            job = self._worklist.pop()
+            jobs.append((self._jobs[job], self._canon_fields(job)))
+        jobs.sort(key=lambda x: x[0])
+        return state + (tuple(jobs),)
+
+    def _canon_agenda(self):
+        kernel = self._model.kernel
+        progress = self._model.progress
+        entries = sorted(e for e in kernel._agenda if not e[4])
+        return (
+            tuple((e[0] - self._now, self._canon(e[2]), self._canon(e[3]))
+                  for e in entries if e[3] != (progress,)),
+            tuple(self._canon(p) for p in kernel._cond_queue)
+        )
+
+    def _canon_etm(self):
+        etm = self._model.etm
+        state = []
+        for task in self._model.task_list:
+            for job in task._activations_fifo:
+                date = etm.on_execute_date.get(job)
+                state.append((self._canon(job), etm.executed.get(job),
+                              None if date is None else date - self._now))
+        return tuple(state)
+
+    def _canon_scheduler(self, scheduler):
+        return tuple((key, self._canon(value))
+                     for key, value in sorted(vars(scheduler).items())
+                     if key not in _SCHEDULER_STATIC)
+
+    def _canon_job(self, job):
+        if job not in self._jobs:
+            self._jobs[job] = ('job', job.task.identifier,
+                               job.activation_date_cycles - self._now)
+            self._worklist.append(job)
+        return self._jobs[job]
+
+    def _canon_fields(self, obj):
+        """
+        State of a process (task, processor, job or timer).
+        """
+        result = []
+        for key, value in sorted(_fields(obj).items()):
+            if key in _SKIPPED:
+                continue
+            if value is not None:
+                if key in _CYCLE_DATES:
+                    value = value - self._now
+            result.append((key, self._canon(value)))
+        return tuple(result)
+
+    def _canon(self, obj):
+        self._size += 1
+        if obj is None or isinstance(obj, (bool, int, float, str,
+                                           Fraction)):
+            return obj
+        if isinstance(obj, Job):
+            return self._canon_job(obj)
+        if isinstance(obj, GenericTask):
+            return ('task', obj.identifier)
+        if isinstance(obj, Processor):
+            return ('cpu', obj.identifier)
+        if obj is self._model:
+            return ('model',)
+        if obj is self._model.scheduler:
+            return ('scheduler',)
+        # The pending deadlines are entries of the agenda.
+        if isinstance(obj, (AbstractExecutionTimeModel, Monitor, Trace,
+                            Logger, NativeKernel, DeadlineSupervisor)):
+            return (type(obj).__name__,)
+        if isinstance(obj, Signal):
+            return ('signal', tuple(self._canon(p) for p in obj._waiters))
+        if isinstance(obj, (tuple, list, deque)):
+            return (type(obj).__name__, tuple(self._canon(x) for x in obj))
+        if isinstance(obj, dict):
+            return ('dict', tuple((self._canon(k), self._canon(v))
+                                  for k, v in obj.items()))
+        if isinstance(obj, (set, frozenset)):
+            return ('set', frozenset(self._canon(x) for x in obj))
+        if isinstance(obj, types.GeneratorType):
+            frame = obj.gi_frame
+            if frame is None:
+                return ('generator', obj.__name__)
+            return ('generator', obj.__name__, frame.f_lasti,
+                    self._canon(dict(frame.f_locals)))
+        if isinstance(obj, types.MethodType):
+            return ('method', obj.__func__.__name__,
+                    self._canon(obj.__self__))
+        if isinstance(obj, types.FunctionType):
+            cells = obj.__closure__ or ()
+            return ('function', obj.__qualname__,
+                    tuple(self._canon(c.cell_contents) for c in cells))
+        if isinstance(obj, types.BuiltinFunctionType):
+            return ('builtin', obj.__name__)
+
+        # Any other object (timers, servers, etc.). Cycles are cut.
+        if id(obj) in self._visiting:
+            return ('cycle', type(obj).__name__)
+        self._visiting.add(id(obj))
+        try:
+            if isinstance(obj, (Process, Timer)):
+                fields = self._canon_fields(obj)
+            elif isinstance(obj, Scheduler):
+                fields = self._canon_scheduler(obj)
+            elif hasattr(obj, '__dict__'):
+                fields = tuple((k, self._canon(v))
+                               for k, v in sorted(vars(obj).items()))
+            else:
+                fields = repr(obj)
+        finally:
+            self._visiting.discard(id(obj))
+        return (type(obj).__name__, fields)
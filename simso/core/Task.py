@@ -1,9 +1,9 @@
 # coding=utf-8
 
 from collections import deque
-from SimPy.Simulation import Process, Monitor, hold, passivate
+from simso.core.kernel import Process, StateMachine, hold, passivate
+from simso.core.Trace import JobTrace, JOBS
 from simso.core.Job import Job
-from simso.core.Timer import Timer
 from .CSDP import CSDP
 
 import os
@@ -52,7 +52,6 @@ class TaskInfo(object):
         self.acet = acet
         self.et_stddev = et_stddev
         self.base_cpi = base_cpi
-        self._stack = None
         self._csdp = None
         self._stack_file = ''
         self.set_stack_file(*stack_file)
@@ -80,27 +79,18 @@ class TaskInfo(object):
 
     def set_stack_file(self, stack_file, cur_dir):
         """
-        Set the stack distance profile.
+        Set the stack distance profile: a text file with one distance and
+        its frequency per line, or a ``.npy`` file written by
+        :meth:`CSDP.save <simso.core.CSDP.CSDP.save>`. The tasks that use
+        the same file share its profile.
         """
         if stack_file:
             try:
-                self._stack = TaskInfo._parse_stack(stack_file)
-                self._csdp = CSDP(self._stack)
+                self._csdp = CSDP.load(stack_file)
                 self._stack_file = os.path.relpath(stack_file, cur_dir)
             except Exception as e:
                 print("set_stack_file failed:", e)
 
-    @staticmethod
-    def _parse_stack(stack_file):
-        stack = {}
-        if stack_file and os.path.isfile(stack_file):
-            for line in open(stack_file):
-                dist, value = line.split()
-                stack[int(dist)] = float(value)
-        else:
-            stack = None
-        return stack
-
 
 class GenericTask(Process):
     """
@@ -130,16 +120,19 @@ class GenericTask(Process):
         Process.__init__(self, name=task_info.name, sim=sim)
         self.name = task_info.name
         self._task_info = task_info
-        self._monitor = Monitor(name="Monitor" + self.name + "_states",
-                                sim=sim)
+        self._monitor = JobTrace(name="Monitor" + self.name + "_states",
+                                 sim=sim, enabled=JOBS in sim.trace)
         self._activations_fifo = deque([])
         self._sim = sim
+        # Position of the task in the task list of the model.
+        self._internal_id = len(sim.task_list)
         self.cpu = None
         self._etm = sim.etm
         self._job_count = 0
         self._last_cpu = None
         self._cpi_alone = {}
         self._jobs = []
+        self._step = 0
         self.job = None
 
     def __lt__(self, other):
@@ -225,8 +218,8 @@ class GenericTask(Process):
     @property
     def monitor(self):
         """
-        The monitor for this Task. Similar to a log mechanism (see Monitor in
-        SimPy doc).
+        The monitor for this Task, a :class:`JobTrace
+        <simso.core.Trace.JobTrace>` of the events of its jobs.
         """
         return self._monitor
 
@@ -249,8 +242,25 @@ class GenericTask(Process):
         """
         return self._jobs
 
+    def free_finished_jobs(self):
+        """
+        Forget the jobs that are finished: they are removed from
+        :attr:`jobs` and from the execution time model, so that their memory
+        can be reclaimed. The :attr:`monitor` still refers to them. A freed
+        job must not be used anymore.
+        """
+        jobs = []
+        for job in self._jobs:
+            if job.is_active():
+                jobs.append(job)
+            else:
+                self._etm.forget(job)
+        self._jobs = jobs
+
     def end_job(self, job):
         self._last_cpu = self.cpu
+        if self._task_info.abort_on_miss:
+            self._sim.deadlines.release(job)
         if self.followed_by:
             self.followed_by.create_job(job)
 
@@ -258,12 +268,12 @@ class GenericTask(Process):
             self._activations_fifo.popleft()
         if len(self._activations_fifo) > 0:
             self.job = self._activations_fifo[0]
-            self.sim.activate(self.job, self.job.activate_job())
+            self.job.activate_job()
 
     def _job_killer(self, job):
         if job.end_date is None and job.computation_time < job.wcet:
             if self._task_info.abort_on_miss:
-                self.cancel(job)
+                job._cancel()
                 job.abort()
 
     def create_job(self, pred=None):
@@ -277,18 +287,27 @@ class GenericTask(Process):
 
         if len(self._activations_fifo) == 0:
             self.job = job
-            self.sim.activate(job, job.activate_job())
+            job.activate_job()
         self._activations_fifo.append(job)
         self._jobs.append(job)
 
-        timer_deadline = Timer(self.sim, GenericTask._job_killer,
-                               (self, job), self.deadline)
-        timer_deadline.start()
+        # A missed deadline only needs an event if the job must be aborted.
+        if self._task_info.abort_on_miss:
+            self._sim.deadlines.watch(
+                job, int(self.deadline * self._sim.cycles_per_ms))
 
     def _init(self):
         if self.cpu is None:
             self.cpu = self._sim.processors[0]
 
+    def execute(self):
+        """
+        Behavior of the task, a :class:`state machine \
+        <simso.core.kernel.Process.StateMachine>`.
+        """
+        self._step = 0
+        return StateMachine(self._next_command)
+
 
 class ATask(GenericTask):
     """
@@ -297,9 +316,12 @@ class ATask(GenericTask):
     """
     fields = ['deadline', 'wcet']
 
-    def execute(self):
-        self._init()
-        yield passivate, self
+    def _next_command(self):
+        if self._step == 0:
+            self._init()
+            self._step = 1
+            return passivate, self
+        raise StopIteration
 
 
 class PTask(GenericTask):
@@ -309,16 +331,16 @@ class PTask(GenericTask):
     """
     fields = ['activation_date', 'period', 'deadline', 'wcet']
 
-    def execute(self):
-        self._init()
-        # wait the activation date.
-        yield hold, self, int(self._task_info.activation_date *
-                              self._sim.cycles_per_ms)
+    def _next_command(self):
+        if self._step == 0:
+            self._init()
+            self._step = 1
+            # wait the activation date.
+            return hold, self, int(self._task_info.activation_date *
+                                   self._sim.cycles_per_ms)
 
-        while True:
-            #print self.sim.now(), "activate", self.name
-            self.create_job()
-            yield hold, self, int(self.period * self._sim.cycles_per_ms)
+        self.create_job()
+        return hold, self, int(self.period * self._sim.cycles_per_ms)
 
 
 class SporadicTask(GenericTask):
@@ -328,13 +350,20 @@ class SporadicTask(GenericTask):
     """
     fields = ['list_activation_dates', 'deadline', 'wcet']
 
-    def execute(self):
+    def _next_command(self):
+        # The step is the number of activation dates already waited.
+        if self._step == 0:
+            self._init()
+        else:
+            self.create_job()
 
-        self._init()
-        for ndate in self.list_activation_dates:
-            yield hold, self, int(ndate * self._sim.cycles_per_ms) \
+        dates = self.list_activation_dates
+        if self._step < len(dates):
+            ndate = dates[self._step]
+            self._step += 1
+            return hold, self, int(ndate * self._sim.cycles_per_ms) \
                 - self._sim.now()
-            self.create_job()
+        raise StopIteration
 
     @property
     def list_activation_dates(self):
@@ -1,39 +1,8 @@
 # coding=utf-8
 
-from SimPy.Simulation import Process, hold
-
 # TODO: allow the user to specify an overhead.
 
 
-class InstanceTimer(Process):
-    def __init__(self, timer):
-        Process.__init__(self, name="Timer", sim=timer.sim)
-        self.function = timer.function
-        self.args = timer.args
-        self.delay = timer.delay
-        self.one_shot = timer.one_shot
-        self.cpu = timer.cpu
-        self.running = False
-        self.overhead = timer.overhead
-
-    def call_handler(self):
-        if self.running:
-            self.function(*self.args)
-
-    def run(self):
-        self.running = True
-        while self.running:
-            yield hold, self, self.delay
-            if self.interrupted() or not self.running:
-                break
-            if self.cpu:
-                self.cpu.timer(self)
-            else:
-                self.call_handler()
-            if self.one_shot:
-                break
-
-
 class Timer(object):
     """
     Allow to declare a timer. A timer is a mechanism that allows to call a
@@ -47,6 +16,11 @@ class Timer(object):
 
     The delay is expressed in milliseconds by default but it can also be given
     in cycles.
+
+    A timer is not a process: its expiry is an entry in the agenda of the
+    :mod:`kernel <simso.core.kernel>`, which is removed when the timer is
+    stopped. An expiry that is already queued on the processor is ignored
+    if the timer is stopped or started again before it is handled.
     """
     def __init__(self, sim, function, args, delay, one_shot=True, prior=False,
                  cpu=None, in_ms=True, overhead=0):
@@ -77,23 +51,68 @@ class Timer(object):
         self.one_shot = one_shot
         self.prior = prior
         self.cpu = cpu
-        self.instance = None
+        self.running = False
+        self._handle = None
+        # Number of the current arming and number of expiries queued on the
+        # processor.
+        self._generation = 0
+        self._queued = 0
         if in_ms:
             self.overhead = int(overhead * sim.cycles_per_ms)
         else:
             self.overhead = int(overhead)
         assert self.delay >= 0, "delay must be >= 0"
 
+    def _arm(self):
+        # The expiry is posted by an event of the current date, like the
+        # processes used to do, so that the order of the events is kept.
+        self._handle = self.sim.kernel.schedule(self.delay, Timer._expire,
+                                                (self,))
+
+    def _expire(self):
+        self._handle = None
+        if self.cpu:
+            self._queued += 1
+            self.cpu.timer(self, self._generation)
+        else:
+            self.call_handler()
+        if not self.one_shot and self.running and self._handle is None:
+            self._arm()
+
+    def call_handler(self, generation=None):
+        """
+        Call the function of the timer if it is running. The `generation` is
+        the one of the arming that queued the expiry on the processor, if
+        any: the function is not called for a previous arming.
+        """
+        if generation is not None:
+            self._queued -= 1
+            if generation != self._generation:
+                return
+        if self.running:
+            self.function(*self.args)
+
     def start(self):
         """
-        Start the timer.
+        Start the timer. A timer that is already started is restarted.
         """
-        self.instance = InstanceTimer(self)
-        self.sim.activate(self.instance, self.instance.run(), self.prior)
+        kernel = self.sim.kernel
+        if self._handle is not None:
+            kernel.unschedule(self._handle)
+        if self._queued:
+            self._generation += 1
+        else:
+            # No expiry to ignore: numbering the armings from 0 again keeps
+            # the state of the timer periodic.
+            self._generation = 0
+        self.running = True
+        self._handle = kernel.schedule(0, Timer._arm, (self,), self.prior)
 
     def stop(self):
         """
         Stop the timer.
         """
-        if self.instance:
-            self.instance.running = False
+        self.running = False
+        if self._handle is not None:
+            self.sim.kernel.unschedule(self._handle)
+            self._handle = None
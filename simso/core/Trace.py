@@ -0,0 +1,561 @@
+# coding=utf-8
+
+import json
+import mmap
+import struct
+from array import array
+from bisect import bisect_right
+
+from simso.core.JobEvent import JobEvent
+from simso.core.ProcEvent import ProcEvent, ProcRunEvent, ProcIdleEvent, \
+    ProcOverheadEvent, ProcCxtSaveEvent, ProcCxtLoadEvent
+from simso.core.SchedulerEvent import SchedulerEvent, \
+    SchedulerBeginScheduleEvent, SchedulerEndScheduleEvent, \
+    SchedulerBeginActivateEvent, SchedulerEndActivateEvent, \
+    SchedulerBeginTerminateEvent, SchedulerEndTerminateEvent
+
+# Names of the traces that can be enabled in the trace profile of a model
+# (see the `trace` argument of :class:`Model <simso.core.Model.Model>`).
+JOBS = 'jobs'
+PROCESSORS = 'processors'
+SCHEDULER = 'scheduler'
+TIMERS = 'timers'
+TRACES = frozenset([JOBS, PROCESSORS, SCHEDULER, TIMERS])
+
+# Codes of the events of the processors.
+RUN = 1
+IDLE = 2
+ACTIVATION_OVERHEAD = 3
+TERMINATION_OVERHEAD = 4
+SCHEDULING_OVERHEAD = 5
+CONTEXT_SAVE = 6
+CONTEXT_SAVED = 7
+CONTEXT_LOAD = 8
+CONTEXT_LOADED = 9
+
+# State of a processor after each of its events (ProcEvent.RUN, IDLE or
+# OVERHEAD), indexed by the code of the event.
+PROC_STATES = ((None, ProcEvent.RUN, ProcEvent.IDLE) +
+               (ProcEvent.OVERHEAD,) * 7)
+
+_OVERHEADS = {
+    ACTIVATION_OVERHEAD: "JobActivation",
+    TERMINATION_OVERHEAD: "JobTermination",
+    SCHEDULING_OVERHEAD: "Scheduling",
+}
+
+_SCHEDULER_EVENTS = {
+    SchedulerEvent.BEGIN_SCHEDULE: SchedulerBeginScheduleEvent,
+    SchedulerEvent.END_SCHEDULE: SchedulerEndScheduleEvent,
+    SchedulerEvent.BEGIN_ACTIVATE: SchedulerBeginActivateEvent,
+    SchedulerEvent.END_ACTIVATE: SchedulerEndActivateEvent,
+    SchedulerEvent.BEGIN_TERMINATE: SchedulerBeginTerminateEvent,
+    SchedulerEvent.END_TERMINATE: SchedulerEndTerminateEvent,
+}
+
+
+# Trailer of a trace file: offset of the chunk index, number of chunks, size
+# of the description of the traces, then the magic string.
+_MAGIC = b'SIMSOTRC'
+_TRAILER = struct.Struct('<qqq8s')
+
+
+class Column(object):
+    """
+    Read-only sequence of the values of a column of a trace that is written
+    to a :class:`TraceFile`: the values of the chunks already written, read
+    from the memory-mapped file, then the values still in memory.
+    """
+    def __init__(self, chunks, buffer):
+        self._chunks = chunks
+        self._buffer = buffer
+        self._starts = []
+        start = 0
+        for chunk in chunks:
+            self._starts.append(start)
+            start += len(chunk)
+        self._size = start
+
+    def __len__(self):
+        return self._size + len(self._buffer)
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            for value in chunk:
+                yield value
+        for value in self._buffer:
+            yield value
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index >= self._size:
+            return self._buffer[index - self._size]
+        if index < 0:
+            raise IndexError("Column index out of range")
+        chunk = bisect_right(self._starts, index) - 1
+        return self._chunks[chunk][index - self._starts[chunk]]
+
+
+class TraceFile(object):
+    """
+    Sink that writes the traces of a model to a binary file, so that their
+    memory stays bounded however long the simulation is. Each trace keeps
+    at most `chunk_size` events in memory; a full chunk is appended to the
+    file, one column after the other. The index of the chunks is kept in
+    memory and written at the end of the file by :meth:`close`.
+
+    The columns of the traces (:attr:`Trace.dates`, ...) then read the
+    chunks from the memory-mapped file, without loading them, and the
+    :class:`results <simso.core.results.Results>` are computed from them.
+    A file can also be read back by another process with :meth:`load`.
+
+    The jobs are referred to by their task and their number, so that the
+    model does not keep them: they are rebuilt from the file as
+    :class:`TracedJob` objects.
+
+    A model whose traces are written to a file cannot be checkpointed.
+    """
+    def __init__(self, file, chunk_size=65536):
+        """
+        Args:
+            - `file`: Path of the file, or file object opened in binary \
+            read/write mode.
+            - `chunk_size`: Number of events of a chunk.
+        """
+        if isinstance(file, str):
+            file = open(file, 'w+b')
+        self._file = file
+        self.chunk_size = chunk_size
+        self._traces = []
+        self._layouts = []
+        self._chunks = []
+        self._map = None
+        self._closed = False
+        file.write(_MAGIC)
+        self._size = len(_MAGIC)
+
+    def register(self, trace):
+        """
+        Add a trace to the file and return its number.
+        """
+        self._traces.append(trace)
+        self._layouts.append([trace.name, trace.COLUMNS])
+        self._chunks.append([])
+        return len(self._traces) - 1
+
+    def write(self, trace):
+        """
+        Append the events in memory of the `trace` to the file, as a chunk.
+        """
+        count = len(trace._dates)
+        if count == 0:
+            return
+        self._chunks[trace._number].append((self._size, count))
+        for name, typecode in trace.COLUMNS:
+            column = getattr(trace, name)
+            column.tofile(self._file)
+            self._size += column.itemsize * count
+            del column[:]
+        # The chunks are aligned on 8 bytes, like the largest values.
+        padding = -self._size % 8
+        self._file.write(b'\0' * padding)
+        self._size += padding
+        trace._columns = None
+
+    def close(self):
+        """
+        Write the events left in memory and the index of the chunks. The
+        traces can still be read afterwards.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for trace in self._traces:
+            self.write(trace)
+        index = array('q')
+        for number, chunks in enumerate(self._chunks):
+            for offset, count in chunks:
+                index.extend((number, offset, count))
+        layouts = json.dumps(self._layouts).encode('utf-8')
+        index.tofile(self._file)
+        self._file.write(layouts)
+        self._file.write(_TRAILER.pack(self._size, len(index) // 3,
+                                       len(layouts), _MAGIC))
+        self._file.flush()
+
+    def columns(self, number, layout, buffers=None):
+        """
+        Return the columns of the trace `number` as a dictionary of
+        :class:`Column`, by name. `layout` gives the name and the type of
+        the columns, `buffers` the values still in memory.
+        """
+        self._file.flush()
+        if self._map is None or len(self._map) < self._size:
+            self._map = mmap.mmap(self._file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        data = memoryview(self._map)
+        views = dict((name, []) for name, _ in layout)
+        for offset, count in self._chunks[number]:
+            for name, typecode in layout:
+                size = array(typecode).itemsize * count
+                views[name].append(data[offset:offset + size].cast(typecode))
+                offset += size
+        return dict((name, Column(views[name],
+                                  buffers[name] if buffers else array(tc)))
+                    for name, tc in layout)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Open a file written by a :class:`TraceFile` and return a dictionary
+        of the columns of its traces, by name of trace and of column (e.g.
+        ``load(path)["MonitorScheduler"]["_dates"]``). The file is
+        memory-mapped and its values are only read when accessed.
+        """
+        trace_file = cls.__new__(cls)
+        trace_file._file = open(path, 'rb')
+        trace_file._map = None
+        trace_file._file.seek(-_TRAILER.size, 2)
+        trace_file._size = trace_file._file.tell()
+        index_offset, count, size, magic = _TRAILER.unpack(
+            trace_file._file.read(_TRAILER.size))
+        if magic != _MAGIC:
+            raise ValueError("{} is not a trace file.".format(path))
+        trace_file._file.seek(index_offset)
+        index = array('q')
+        index.fromfile(trace_file._file, 3 * count)
+        layouts = json.loads(trace_file._file.read(size).decode('utf-8'))
+        trace_file._chunks = [[] for _ in layouts]
+        for i in range(count):
+            trace_file._chunks[index[3 * i]].append(
+                (index[3 * i + 1], index[3 * i + 2]))
+        return dict((name, trace_file.columns(number, layout))
+                    for number, (name, layout) in enumerate(layouts))
+
+
+class TracedJob(object):
+    """
+    A job as recorded in the traces, rebuilt from its task and its number
+    when the model does not keep the jobs (see :class:`TraceFile`). It
+    gives the name, the task and the dates of the job.
+    """
+    __slots__ = ('task', 'number', '_activation_date_cycles')
+
+    def __init__(self, task, number, activation_date_cycles=None):
+        self.task = task
+        self.number = number
+        self._activation_date_cycles = activation_date_cycles
+
+    def __eq__(self, other):
+        return (isinstance(other, TracedJob) and self.task is other.task and
+                self.number == other.number)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((id(self.task), self.number))
+
+    def __repr__(self):
+        return "<TracedJob {}>".format(self.name)
+
+    @property
+    def name(self):
+        return "{}_{}".format(self.task.name, self.number)
+
+    @property
+    def sim(self):
+        return self.task.sim
+
+    @property
+    def activation_date_cycles(self):
+        """
+        Activation date in cycles, read from the trace of the task if it
+        was not given (None if the trace of the jobs is not recorded).
+        """
+        if self._activation_date_cycles is None:
+            self._activation_date_cycles = \
+                self.task.monitor.activation_date(self.number)
+        return self._activation_date_cycles
+
+    @property
+    def absolute_deadline_cycles(self):
+        activation = self.activation_date_cycles
+        if activation is None:
+            return None
+        return activation + int(self.task.deadline * self.sim.cycles_per_ms)
+
+    @property
+    def activation_date(self):
+        activation = self.activation_date_cycles
+        if activation is None:
+            return None
+        return float(activation) / self.sim.cycles_per_ms
+
+    @property
+    def absolute_deadline(self):
+        deadline = self.absolute_deadline_cycles
+        if deadline is None:
+            return None
+        return deadline / float(self.sim.cycles_per_ms)
+
+
+class Trace(object):
+    """
+    Record of dated events, stored in columns of typed arrays: the date (in
+    cycles), the code of the event, the job and the processor concerned by
+    the event (-1 if none). The jobs are referred to by the internal id of
+    their task and their number in that task, the processors by their
+    internal id. No object is allocated per event.
+
+    A trace can also be read like a :class:`Monitor
+    <simso.core.Monitor.Monitor>`, as a sequence of ``[date, event]``
+    items. The event objects (:class:`JobEvent
+    <simso.core.JobEvent.JobEvent>`, :class:`ProcEvent
+    <simso.core.ProcEvent.ProcEvent>`, :class:`SchedulerEvent
+    <simso.core.SchedulerEvent.SchedulerEvent>`) are then built on demand.
+
+    A trace that is not enabled stays empty: the callers check the
+    `enabled` attribute before recording an event. When the model has a
+    :class:`TraceFile`, the events are written to it by chunks.
+    """
+    # Name and type of the columns, by decreasing size of the values.
+    COLUMNS = (('_dates', 'q'), ('_jobs', 'i'), ('_tasks', 'h'),
+               ('_cpus', 'h'), ('_codes', 'b'))
+
+    def __init__(self, name, sim, enabled=True):
+        """
+        Args:
+            - `name`: Name of the trace.
+            - `sim`: The :class:`model <simso.core.Model.Model>` object.
+            - `enabled`: Whether the events are recorded.
+        """
+        self.name = name
+        self.sim = sim
+        self.enabled = enabled
+        for column, typecode in self.COLUMNS:
+            setattr(self, column, array(typecode))
+        self._sink = sim.trace_sink
+        self._columns = None
+        if self._sink is not None and enabled:
+            self._number = self._sink.register(self)
+        else:
+            self._sink = None
+
+    def record(self, code, job=None, cpu=None):
+        """
+        Record the event `code` at the current date.
+        """
+        self._dates.append(self.sim.now())
+        self._codes.append(code)
+        if job is None:
+            self._jobs.append(-1)
+            self._tasks.append(-1)
+        else:
+            self._jobs.append(job._number)
+            self._tasks.append(job._task._internal_id)
+        self._cpus.append(-1 if cpu is None else cpu.internal_id)
+        if self._sink is not None and \
+                len(self._dates) >= self._sink.chunk_size:
+            self._sink.write(self)
+
+    def _column(self, name):
+        if self._sink is None:
+            return getattr(self, name)
+        if self._columns is None:
+            self._columns = self._sink.columns(
+                self._number, self.COLUMNS,
+                dict((column, getattr(self, column))
+                     for column, _ in self.COLUMNS))
+        return self._columns[name]
+
+    @property
+    def dates(self):
+        """The dates of the events, in cycles."""
+        return self._column('_dates')
+
+    @property
+    def codes(self):
+        """The codes of the events."""
+        return self._column('_codes')
+
+    @property
+    def jobs(self):
+        """The numbers of the jobs of the events in their task, -1 if
+        none."""
+        return self._column('_jobs')
+
+    @property
+    def tasks(self):
+        """The internal ids of the tasks of the jobs of the events, -1 if
+        none."""
+        return self._column('_tasks')
+
+    @property
+    def cpus(self):
+        """The internal ids of the processors of the events, -1 if none."""
+        return self._column('_cpus')
+
+    def observe(self, y, t=None):
+        """
+        Record an event object, for compatibility with the :class:`Monitor
+        <simso.core.Monitor.Monitor>`. The date is ignored.
+        """
+        self.record(*self._encode(y))
+
+    def job(self, index):
+        """
+        Job of the `index`-th event, or None.
+        """
+        task = self.tasks[index]
+        if task < 0:
+            return None
+        return self.sim.traced_job(task, self.jobs[index])
+
+    def cpu(self, index):
+        """
+        Processor of the `index`-th event, or None.
+        """
+        cpu = self.cpus[index]
+        return None if cpu < 0 else self.sim.processors[cpu]
+
+    def _encode(self, y):
+        return (0,)
+
+    def _event(self, index):
+        return None
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __iter__(self):
+        for index, date in enumerate(self.dates):
+            yield [date, self._event(index)]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return [self.dates[index], self._event(index)]
+
+    def tseries(self):
+        """The series of dates."""
+        return list(self.dates)
+
+    def yseries(self):
+        """The series of events."""
+        return [self._event(index) for index in range(len(self))]
+
+
+class JobTrace(Trace):
+    """
+    Trace of the jobs of a task. The codes are those of :class:`JobEvent
+    <simso.core.JobEvent.JobEvent>`. Each event also has a sequence number,
+    common to all the tasks, that gives the order of the events of a same
+    date.
+    """
+    COLUMNS = (('_dates', 'q'), ('_ids', 'q'), ('_jobs', 'i'),
+               ('_tasks', 'h'), ('_cpus', 'h'), ('_codes', 'b'))
+
+    def __init__(self, name, sim, enabled=True):
+        Trace.__init__(self, name, sim, enabled)
+        # Dates of the activations, by job number, read from the events.
+        self._activations = array('q')
+        self._activations_read = 0
+
+    def record(self, code, job=None, cpu=None):
+        JobEvent.count += 1
+        self._ids.append(JobEvent.count)
+        Trace.record(self, code, job, cpu)
+
+    @property
+    def ids(self):
+        """The sequence numbers of the events."""
+        return self._column('_ids')
+
+    def activation_date(self, number):
+        """
+        Activation date of the job `number` of the task (None if the events
+        of the task are not recorded). The jobs of a task are activated in
+        the order of their numbers.
+        """
+        codes = self.codes
+        dates = self.dates
+        for index in range(self._activations_read, len(codes)):
+            if codes[index] == JobEvent.ACTIVATE:
+                self._activations.append(dates[index])
+        self._activations_read = len(codes)
+        if 0 < number <= len(self._activations):
+            return self._activations[number - 1]
+        return None
+
+    def _encode(self, y):
+        return y.event, y.job, y.cpu
+
+    def _event(self, index):
+        return JobEvent(self.job(index), self.codes[index], self.cpu(index),
+                        id_=self.ids[index])
+
+
+class ProcessorTrace(Trace):
+    """
+    Trace of a processor: execution of a job (RUN), idle state (IDLE) and
+    overheads (the other codes of this module).
+    """
+    def _encode(self, y):
+        if y.event == ProcEvent.RUN:
+            return RUN, y.args
+        elif y.event == ProcEvent.IDLE:
+            return IDLE,
+        elif y.args == "CS":
+            return CONTEXT_SAVED if y.terminated else CONTEXT_SAVE,
+        elif y.args == "CL":
+            return CONTEXT_LOADED if y.terminated else CONTEXT_LOAD,
+        for code, name in _OVERHEADS.items():
+            if y.args == name:
+                return code,
+        raise ValueError("Unknown processor event: {}".format(y.args))
+
+    def _event(self, index):
+        code = self.codes[index]
+        if code == RUN:
+            return ProcRunEvent(self.job(index))
+        elif code == IDLE:
+            return ProcIdleEvent()
+        elif code in (CONTEXT_SAVE, CONTEXT_SAVED):
+            return ProcCxtSaveEvent(terminated=code == CONTEXT_SAVED)
+        elif code in (CONTEXT_LOAD, CONTEXT_LOADED):
+            return ProcCxtLoadEvent(terminated=code == CONTEXT_LOADED)
+        return ProcOverheadEvent(_OVERHEADS[code])
+
+
+class SchedulerTrace(Trace):
+    """
+    Trace of the scheduler. The codes are those of :class:`SchedulerEvent
+    <simso.core.SchedulerEvent.SchedulerEvent>`, with the processor that
+    called the scheduler.
+    """
+    def _encode(self, y):
+        return y.event, None, y.cpu
+
+    def _event(self, index):
+        return _SCHEDULER_EVENTS[self.codes[index]](self.cpu(index))
+
+
+class TimerTrace(Trace):
+    """
+    Dates at which the timers of a processor were fired. The events are
+    None, only the dates and the codes are stored.
+    """
+    COLUMNS = (('_dates', 'q'), ('_codes', 'b'))
+
+    def record(self, code=0, job=None, cpu=None):
+        self._dates.append(self.sim.now())
+        self._codes.append(code)
+        if self._sink is not None and \
+                len(self._dates) >= self._sink.chunk_size:
+            self._sink.write(self)
@@ -2,19 +2,53 @@ from simso.core.etm.AbstractExecutionTimeModel \
     import AbstractExecutionTimeModel
 import random
 
-# TODO: the seed should be specified in order to evaluate on identical systems.
-# More precisely, the computation time of the jobs should remain the same.
+import numpy as np
 
 
 class ACET(AbstractExecutionTimeModel):
+    """
+    The execution time of each job is drawn from a normal distribution of
+    mean the ACET of its task and of standard deviation its et_stddev,
+    truncated at its WCET.
+
+    Each task has its own random stream, seeded from the seed of the
+    configuration and the identifier of the task: with the same seed, the
+    jobs of a task have the same execution times whatever the scheduler.
+    Without a seed, the seed is drawn from the random module. The execution
+    times are sampled by blocks of `block_size` jobs.
+    """
+    block_size = 4096
+
     def __init__(self, sim, _):
         self.sim = sim
         self.et = {}
         self.executed = {}
         self.on_execute_date = {}
+        self._streams = {}
 
     def init(self):
-        pass
+        self._seed = self.sim.seed
+        if self._seed is None:
+            self._seed = random.getrandbits(32)
+
+    def _sample(self, task):
+        try:
+            stream = self._streams[task]
+        except KeyError:
+            # The random stream of the task, the parameters of its current
+            # block and the execution times (in cycles) left in the block.
+            stream = self._streams[task] = [
+                np.random.RandomState([self._seed, task.identifier % 2 ** 32]),
+                None, []]
+        params = (task.acet, task.et_stddev, task.wcet)
+        if stream[1] != params or not stream[2]:
+            samples = np.minimum(
+                stream[0].normal(task.acet, task.et_stddev, self.block_size),
+                task.wcet) * self.sim.cycles_per_ms
+            stream[1] = params
+            # Consumed from the end.
+            stream[2] = samples[::-1].tolist()
+        return stream[2].pop()
 
     def update_executed(self, job):
         if job in self.on_execute_date:
@@ -25,10 +59,7 @@ class ACET(AbstractExecutionTimeModel):
 
     def on_activate(self, job):
         self.executed[job] = 0
-        self.et[job] = min(
-            job.task.wcet,
-            random.normalvariate(job.task.acet, job.task.et_stddev)
-        ) * self.sim.cycles_per_ms
+        self.et[job] = self._sample(job.task)
 
     def on_execute(self, job):
         self.on_execute_date[job] = self.sim.now()
@@ -36,5 +36,25 @@ class AbstractExecutionTimeModel(object):
     def get_ret(self, _):
         return
 
+    def get_completion(self, job):
+        """
+        Time in cycles before the end of a running job, if the other running
+        jobs do not change. The job executes until then and ends if
+        :meth:`get_ret` is not positive anymore. By default, this is the
+        remaining execution time.
+
+        A model whose prediction depends on the other running jobs calls
+        ``job._update_completion()`` for the jobs whose prediction changed.
+        """
+        return self.get_ret(job)
+
     def get_executed(self, job):
         return job.computation_time_cycles
+
+    def forget(self, job):
+        """
+        Drop the data kept for a finished job.
+        """
+        for value in vars(self).values():
+            if isinstance(value, dict):
+                value.pop(job, None)
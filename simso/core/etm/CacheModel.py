@@ -27,30 +27,19 @@ def cpi_alone(task, cache_sizes, penalties):
     return calc_cpi(task.base_cpi, task.mix, miss_rates, penalties)
 
 
-def calc_cache_sizes(caches, task, running_jobs):
+class CacheModel(AbstractExecutionTimeModel):
     """
-    Compute the virtual size of the cache taking into account the other running
-    tasks (FOA model).
+    The number of instructions executed by the running jobs depends on the
+    part of the caches they get (FOA model): each job gets a part of each
+    of its caches proportional to its access frequency (mix / cpi_alone)
+    among the running jobs that share the cache.
+
+    The sum of the access frequencies of the running jobs is kept for each
+    cache and updated when a job starts or stops, and the CPI of the
+    running jobs is only computed again when one of these sums changed.
+    The end of a running job is predicted from its CPI, and moved when
+    another job starts or stops.
     """
-    result = []
-    for cache in caches:
-        shared_jobs = [j for j in running_jobs if j.cpu in cache.shared_with]
-        sum_af = sum(j.task.mix / j.task.get_cpi_alone() for j in shared_jobs)
-        proportion = (task.mix / task.get_cpi_alone()) / sum_af
-
-        result.append(cache.size * proportion)
-    return result
-
-
-def compute_instructions(task, running_jobs, duration):
-    caches = task.cpu.caches
-    penalties = [task.cpu.penalty_memaccess] + [c.penalty for c in caches]
-    sizes = calc_cache_sizes(caches, task, running_jobs)
-    miss_rates = [capacity_miss_LRU(task.csdp, size) for size in sizes]
-    return duration / calc_cpi(task.base_cpi, task.mix, miss_rates, penalties)
-
-
-class CacheModel(AbstractExecutionTimeModel):
     def __init__(self, sim, nb_processors):
         self.sim = sim
         self._nb_processors = nb_processors
@@ -63,6 +52,18 @@ class CacheModel(AbstractExecutionTimeModel):
         self.running = {}
         self.penalty = {}
         self.was_running_on = {}
+        # Sum of the access frequencies of the running jobs sharing each
+        # cache, and number of these jobs.
+        self._shares = {}
+        # Processor on which each running job is accounted.
+        self._job_cpus = {}
+        # CPI of the running jobs, valid while the version is unchanged.
+        self._cpis = {}
+        self._version = 0
+        # Processors whose running job may end at another date, updated by
+        # an event at the end of the current date.
+        self._changed_cpus = set()
+        self._update_pending = False
 
         # precompute cpi_alone for each task on each cpu
         for task in self.sim.task_list:
@@ -74,15 +75,79 @@ class CacheModel(AbstractExecutionTimeModel):
                               [proc.penalty_memaccess] +
                               [c.penalty for c in caches])
                 )
+        for proc in self.sim.processors:
+            for cache in proc.caches:
+                self._shares[cache] = [0.0, 0]
+        # Processors sharing a cache with each processor, and the caches of
+        # each processor with their penalty.
+        self._neighbours = {}
+        self._penalties = {}
+        for proc in self.sim.processors:
+            self._neighbours[proc] = set(
+                other for cache in proc.caches for other in cache.shared_with)
+            self._penalties[proc] = list(zip(
+                proc.caches, [c.penalty for c in proc.caches]))
 
     def update(self):
         self._update_instructions()
 
+    def _add_share(self, job, cpu):
+        self._job_cpus[job] = cpu
+        access = job.task.mix / job.task.get_cpi_alone(cpu)
+        for cache in cpu.caches:
+            share = self._shares[cache]
+            share[0] += access
+            share[1] += 1
+        self._version += 1
+
+    def _remove_share(self, job):
+        cpu = self._job_cpus.pop(job)
+        access = job.task.mix / job.task.get_cpi_alone(cpu)
+        for cache in cpu.caches:
+            share = self._shares[cache]
+            share[1] -= 1
+            # Reset the sum when the cache is free, so that the rounding
+            # errors do not accumulate.
+            share[0] = share[0] - access if share[1] else 0.0
+        self._version += 1
+        return cpu
+
+    def _cpi(self, job):
+        """
+        CPI of a running job, given the virtual size of its caches.
+        """
+        cached = self._cpis.get(job)
+        if cached is not None and cached[0] == self._version:
+            return cached[1]
+        task = job.task
+        cpu = self._job_cpus[job]
+        mix = task.mix
+        access = mix / task.get_cpi_alone(cpu)
+        csdp = task.csdp
+        shares = self._shares
+        # Same computation as calc_cpi with the miss rates of
+        # capacity_miss_LRU, inlined.
+        penalty_per_memaccess = cpu.penalty_memaccess
+        for cache, penalty in self._penalties[cpu]:
+            size = cache.size * (access / shares[cache][0])
+            penalty_per_memaccess += penalty * (1.0 - csdp.get(int(size + .5)))
+        cpi = task.base_cpi + mix * penalty_per_memaccess
+        self._cpis[job] = (self._version, cpi)
+        return cpi
+
     def _update_instructions(self):
+        duration = self.sim.now() - self._last_update
+        if not duration:
+            return
+        for job in self._running_jobs:
+            # The scheduler moves a job to its new processor before it is
+            # preempted on the previous one.
+            if job.cpu is not self._job_cpus[job]:
+                self._remove_share(job)
+                self._add_share(job, job.cpu)
         for job in self._running_jobs:
             # Compute number of instr for self.sim.now() - last_update
-            instr = compute_instructions(job.task, self._running_jobs,
-                                         self.sim.now() - self._last_update)
+            instr = duration / self._cpi(job)
             # Update the number of instr for this job
             self._instr_jobs[job] = self._instr_jobs.get(job, 0) + instr
 
@@ -109,12 +174,36 @@ class CacheModel(AbstractExecutionTimeModel):
         self._update_instructions()
         # Add the job in the list of running jobs.
         self._running_jobs.add(job)
+        self._add_share(job, job.cpu)
+        self._completions_changed(job.cpu)
 
     def _stop_job(self, job):
         # Update the number of instructions executed for the running jobs.
         self._update_instructions()
-        # Remove the job from the list of running jobs.
-        self._running_jobs.remove(job)
+        # Remove the job from the list of running jobs (an aborted job may
+        # not be running).
+        if job in self._running_jobs:
+            self._running_jobs.remove(job)
+            cpu = self._remove_share(job)
+            self._cpis.pop(job, None)
+            self._completions_changed(cpu)
+
+    def _completions_changed(self, cpu):
+        # A job started or stopped on cpu: the CPI of the jobs running on the
+        # processors that share a cache with it changed. The ends of these
+        # jobs are moved once all the events of the date are handled.
+        self._changed_cpus |= self._neighbours[cpu]
+        if not self._update_pending:
+            self._update_pending = True
+            self.sim.kernel.schedule(0, self._update_completions)
+
+    def _update_completions(self):
+        changed = self._changed_cpus
+        self._changed_cpus = set()
+        self._update_pending = False
+        for job in list(self._running_jobs):
+            if self._job_cpus[job] in changed:
+                job._update_completion()
 
     def on_preempted(self, job):
         self._stop_job(job)
@@ -128,5 +217,13 @@ class CacheModel(AbstractExecutionTimeModel):
     def get_ret(self, job):
         self._update_instructions()
         penalty = self.penalty[job]
-        return (job.task.n_instr - self._instr_jobs[job]) \
+        return (job.task.n_instr - self._instr_jobs.get(job, 0)) \
             * job.task.get_cpi_alone() + penalty
+
+    def get_completion(self, job):
+        if job not in self._running_jobs:
+            return self.get_ret(job)
+        # get_ret assumes the job runs alone; it runs slower by the ratio of
+        # its CPI to its CPI alone.
+        return (self.get_ret(job) * self._cpi(job) /
+                job.task.get_cpi_alone())
@@ -0,0 +1,133 @@
+import struct
+
+import numpy as np
+
+from simso.core.etm.ACET import ACET
+
+_MAGIC = b'SIMSOETM'
+_HEADER = struct.Struct('<8sq')
+_ENTRY = struct.Struct('<qqq')
+
+MODES = ('wrap', 'random')
+
+
+def write_execution_times(filename, execution_times):
+    """
+    Write the execution times of the tasks to a file that can be replayed
+    by the :class:`Measured` model.
+
+    The file starts with the magic string "SIMSOETM" and the number of
+    tasks, followed by one entry per task: its identifier, the position of
+    its first execution time and its number of execution times (64-bit
+    little-endian integers). The execution times follow, in milliseconds,
+    as 64-bit little-endian floats.
+
+    Args:
+        - `filename`: The file to write.
+        - `execution_times`: A dictionary whose keys are the identifiers \
+            of the tasks and the values the sequences of execution times \
+            (e.g. NumPy arrays).
+    """
+    with open(filename, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, len(execution_times)))
+        f.write(b'\0' * _ENTRY.size * len(execution_times))
+        entries = []
+        offset = 0
+        for identifier, values in execution_times.items():
+            values = np.asarray(values, dtype='<f8')
+            values.tofile(f)
+            entries.append(_ENTRY.pack(identifier, offset, len(values)))
+            offset += len(values)
+        f.seek(_HEADER.size)
+        f.write(b''.join(entries))
+
+
+class ExecutionTimes(object):
+    """
+    The execution times of a file written by
+    :func:`write_execution_times`. The index of the tasks is read when the
+    object is created; the execution times are memory-mapped when first
+    read, and are not part of the pickled state.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, 'rb') as f:
+            magic, count = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError(
+                    "Not an execution times file: {}".format(filename))
+            self._index = {}
+            for _ in range(count):
+                identifier, offset, length = _ENTRY.unpack(
+                    f.read(_ENTRY.size))
+                self._index[identifier] = (offset, length)
+        self._data_offset = _HEADER.size + _ENTRY.size * count
+        self._values = None
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['_values'] = None
+        return state
+
+    def count(self, identifier):
+        """
+        Number of execution times of a task (0 if it is not in the file).
+        """
+        return self._index.get(identifier, (0, 0))[1]
+
+    def get(self, identifier, k):
+        """
+        Execution time (in ms) of the job `k` of a task.
+        """
+        if self._values is None:
+            total = sum(length for _, length in self._index.values())
+            self._values = np.memmap(self.filename, dtype='<f8', mode='r',
+                                     offset=self._data_offset,
+                                     shape=(total,))
+        return self._values.item(self._index[identifier][0] + k)
+
+
+class Measured(ACET):
+    """
+    The execution times of the jobs are replayed from measures, read from a
+    file written by :func:`write_execution_times` (the
+    `execution_times_file` of the configuration). The job `k` of a task
+    gets the execution time `k` of its sequence; once the sequence is
+    exhausted, it starts again from the beginning.
+
+    With the "random" `execution_times_mode`, each task starts at a random
+    position in its sequence, drawn from the seed of the configuration
+    like the streams of the :class:`ACET` model. The default mode is
+    "wrap": all the tasks start at the beginning of their sequence.
+
+    The file is memory-mapped: only the execution times of the simulated
+    jobs are read.
+    """
+    def init(self):
+        ACET.init(self)
+        if self.sim.execution_times_mode not in MODES:
+            raise ValueError("Unknown execution times mode: {}".format(
+                self.sim.execution_times_mode))
+        self._times = ExecutionTimes(self.sim.execution_times_file)
+        random_offset = self.sim.execution_times_mode == 'random'
+        for task in self.sim.task_list:
+            count = self._times.count(task.identifier)
+            if count == 0:
+                raise ValueError(
+                    "No execution time for the task {} in {}.".format(
+                        task.name, self._times.filename))
+            if random_offset:
+                rng = np.random.RandomState(
+                    [self._seed, task.identifier % 2 ** 32])
+                start = rng.randint(count)
+            else:
+                start = 0
+            # Position of the next job of the task and length of the
+            # sequence.
+            self._streams[task] = [start, count]
+
+    def _sample(self, task):
+        stream = self._streams[task]
+        et = self._times.get(task.identifier, stream[0])
+        stream[0] = (stream[0] + 1) % stream[1]
+        return et * self.sim.cycles_per_ms
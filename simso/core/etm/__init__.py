@@ -2,17 +2,20 @@ from .WCET import WCET
 from .ACET import ACET
 from .CacheModel import CacheModel
 from .FixedPenalty import FixedPenalty
+from .Measured import Measured
 
 execution_time_models = {
     'wcet': WCET,
     'acet': ACET,
     'cache': CacheModel,
-    'fixedpenalty': FixedPenalty
+    'fixedpenalty': FixedPenalty,
+    'measured': Measured
 }
 
 execution_time_model_names = {
     'WCET': 'wcet',
     'ACET': 'acet',
     'Cache Model': 'cache',
-    'Fixed Penalty': 'fixedpenalty'
+    'Fixed Penalty': 'fixedpenalty',
+    'Measured': 'measured'
 }
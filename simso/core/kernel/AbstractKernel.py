@@ -0,0 +1,110 @@
+import abc
+
+
+class AbstractKernel(object):
+    """
+    Discrete-event engine on which a :class:`Model <simso.core.Model.Model>`
+    runs. The date is an integer number of cycles.
+
+    A kernel drives two kinds of handlers: the :class:`processes
+    <simso.core.kernel.Process.Process>` (generators yielding ``hold``,
+    ``passivate``, ``waituntil`` or ``waitsignal`` commands) and plain
+    callbacks registered with :meth:`schedule`.
+    """
+    __metaclass__ = abc.ABCMeta
+
+    @abc.abstractmethod
+    def initialize(self):
+        """
+        Clear the agenda and reset the date to 0.
+        """
+        pass
+
+    @abc.abstractmethod
+    def now(self):
+        """
+        Current date in cycles.
+        """
+        return
+
+    @abc.abstractmethod
+    def activate(self, process, generator, prior=False):
+        """
+        Start the execution of `generator` on behalf of `process` at the
+        current date.
+        """
+        pass
+
+    @abc.abstractmethod
+    def reactivate(self, process, prior=False):
+        """
+        Wake up a passive or holding process at the current date.
+        """
+        pass
+
+    @abc.abstractmethod
+    def cancel(self, process):
+        """
+        Cancel the pending wake-up of a process, leaving it passive.
+        """
+        pass
+
+    @abc.abstractmethod
+    def interrupt(self, victim):
+        """
+        Interrupt a holding process. Return the time that was left in its
+        hold, or None if the process was not holding.
+        """
+        return
+
+    @abc.abstractmethod
+    def interrupted(self, process):
+        return
+
+    @abc.abstractmethod
+    def interrupt_reset(self, process):
+        pass
+
+    @abc.abstractmethod
+    def interrupt_left(self, process):
+        return
+
+    @abc.abstractmethod
+    def fire(self, signal):
+        """
+        Evaluate again, at the end of the current event, the conditions of
+        the processes waiting on `signal`.
+        """
+        pass
+
+    @abc.abstractmethod
+    def schedule(self, delay, callback, args=(), prior=False):
+        """
+        Call ``callback(*args)`` in `delay` cycles. Return a handle that can
+        be passed to :meth:`unschedule`.
+        """
+        return
+
+    @abc.abstractmethod
+    def unschedule(self, handle):
+        """
+        Cancel a callback registered with :meth:`schedule`.
+        """
+        pass
+
+    @abc.abstractmethod
+    def simulate(self, until, events=None):
+        """
+        Run the simulation until the date `until` (in cycles). If `events`
+        is given, return after that many events at most, leaving the date at
+        the one of the last event; the return value is then True if the
+        simulation was interrupted for that reason.
+        """
+        pass
+
+    @abc.abstractmethod
+    def stop(self):
+        """
+        Stop the simulation after the current event.
+        """
+        pass
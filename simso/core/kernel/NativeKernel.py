@@ -0,0 +1,220 @@
+# coding=utf-8
+
+from heapq import heappush, heappop, heapify
+from simso.core.kernel.AbstractKernel import AbstractKernel
+from simso.core.kernel.Process import hold, passivate, waituntil, \
+    waitsignal
+
+
+class NativeKernel(AbstractKernel):
+    """
+    In-tree discrete-event kernel. The agenda is a binary heap of entries
+    ``[date, key, function, args, cancelled]`` where the date is an integer
+    number of cycles. The key orders the entries posted for the same date:
+    prior entries first (most recent first), then the others in FIFO order,
+    which matches the ordering of SimPy 2.
+
+    Cancelled entries are only flagged and are discarded when they reach the
+    top of the heap. The heap is compacted when they make up more than half
+    of it, so that frequently cancelled events (such as timers) do not
+    accumulate.
+
+    The state of the kernel can be copied or pickled between two events, as
+    long as the processes are :class:`state machines
+    <simso.core.kernel.Process.StateMachine>` and the callbacks are
+    functions or methods.
+
+    The conditions given to ``waituntil`` are polled after every event, like
+    SimPy does. The conditions given to ``waitsignal`` are only evaluated at
+    the end of an event during which their signal was fired, in the order
+    the processes started waiting.
+    """
+
+    def __init__(self):
+        self.initialize()
+
+    def initialize(self):
+        self._now = 0
+        self._agenda = []
+        self._cancelled = 0
+        self._sortpr = 0
+        self._cond_queue = []
+        self._woken = []
+        self._wait_seq = 0
+        self._stop = False
+        self._simulating = False
+
+    def __getstate__(self):
+        if self._simulating:
+            raise RuntimeError("The kernel cannot be copied during an event.")
+        return self.__dict__
+
+    def now(self):
+        return self._now
+
+    def _push(self, at, function, args, prior):
+        self._sortpr -= 1
+        if prior:
+            entry = [at, self._sortpr, function, args, False]
+        else:
+            entry = [at, -self._sortpr, function, args, False]
+        heappush(self._agenda, entry)
+        return entry
+
+    def _post(self, process, at, prior=False):
+        process._next_time = at
+        process._rec = self._push(at, self._resume, (process,), prior)
+
+    def _cancel(self, entry):
+        entry[4] = True
+        self._cancelled += 1
+        if self._cancelled > 64 and 2 * self._cancelled > len(self._agenda):
+            agenda = self._agenda
+            agenda[:] = [e for e in agenda if not e[4]]
+            heapify(agenda)
+            self._cancelled = 0
+
+    def _unpost(self, process):
+        if process._next_time is not None:
+            if process._rec is not None:
+                self._cancel(process._rec)
+            process._next_time = None
+
+    def activate(self, process, generator, prior=False):
+        if not process._terminated and process._next_time is None:
+            process._generator = generator
+            self._post(process, self._now, prior)
+
+    def reactivate(self, process, prior=False):
+        if not process._terminated:
+            self._unpost(process)
+            self._post(process, self._now, prior)
+
+    def cancel(self, process):
+        self._unpost(process)
+
+    def interrupt(self, victim):
+        if victim._next_time is not None and not victim._in_interrupt:
+            left = victim._next_time - self._now
+            victim._interrupt_left = left
+            victim._in_interrupt = True
+            self.reactivate(victim)
+            return left
+        return None
+
+    def interrupted(self, process):
+        return process._in_interrupt and not process._terminated
+
+    def interrupt_reset(self, process):
+        process._in_interrupt = False
+
+    def interrupt_left(self, process):
+        return process._interrupt_left
+
+    def schedule(self, delay, callback, args=(), prior=False):
+        assert delay >= 0, "Attempt to schedule an event in the past."
+        return self._push(self._now + delay, callback, args, prior)
+
+    def unschedule(self, handle):
+        if not handle[4]:
+            self._cancel(handle)
+
+    def _resume(self, process):
+        process._rec = None
+        try:
+            command = next(process._generator)
+        except StopIteration:
+            process._generator = None
+            process._terminated = True
+            process._next_time = None
+            return
+
+        code = command[0]
+        if code == hold:
+            delay = command[2] if len(command) == 3 else 0
+            assert delay >= 0, "hold: negative delay in " + process.name
+            process._interrupt_left = delay
+            process._in_interrupt = False
+            self._post(process, self._now + delay)
+        elif code == passivate:
+            process._next_time = None
+        elif code == waituntil:
+            cond = command[2]
+            if cond():
+                self._post(process, self._now, prior=True)
+            else:
+                process._cond = cond
+                process._next_time = None
+                self._cond_queue.append(process)
+        elif code == waitsignal:
+            cond = command[3]
+            if cond():
+                self._post(process, self._now, prior=True)
+            else:
+                signal = command[2]
+                process._cond = cond
+                process._signal = signal
+                process._next_time = None
+                self._wait_seq += 1
+                process._wait_seq = self._wait_seq
+                signal._waiters.append(process)
+        else:
+            raise ValueError("Unknown command {} yielded by {}".format(
+                code, process.name))
+
+    def fire(self, signal):
+        self._woken.extend(signal._waiters)
+
+    def _wake(self):
+        woken = self._woken
+        self._woken = []
+        if len(woken) > 1:
+            woken.sort(key=lambda process: process._wait_seq)
+        for process in woken:
+            if process._signal is not None and process._cond():
+                process._signal._waiters.remove(process)
+                process._signal = None
+                process._cond = None
+                self.reactivate(process)
+
+    def _check_conditions(self):
+        cond_queue = self._cond_queue
+        i = 0
+        while i < len(cond_queue):
+            process = cond_queue[i]
+            if process._cond():
+                cond_queue.pop(i)
+                process._cond = None
+                self.reactivate(process)
+            else:
+                i += 1
+
+    def simulate(self, until, events=None):
+        agenda = self._agenda
+        self._stop = False
+        self._simulating = True
+        try:
+            while not self._stop and agenda and agenda[0][0] <= until:
+                entry = heappop(agenda)
+                if entry[4]:
+                    self._cancelled -= 1
+                    continue
+                self._now = entry[0]
+                entry[2](*entry[3])
+                if self._woken:
+                    self._wake()
+                if self._cond_queue:
+                    self._check_conditions()
+                if events is not None:
+                    events -= 1
+                    if events <= 0:
+                        return True
+        finally:
+            self._simulating = False
+
+        if not self._stop and agenda:
+            self._now = until
+        return False
+
+    def stop(self):
+        self._stop = True
@@ -0,0 +1,94 @@
+# coding=utf-8
+
+# Commands that a process can yield, SimPy 2 style:
+#     yield hold, self, delay
+#     yield passivate, self
+#     yield waituntil, self, condition
+#     yield waitsignal, self, signal, condition
+hold = 1
+passivate = 2
+waituntil = 3
+waitsignal = 4
+
+
+class StateMachine(object):
+    """
+    Iterator of the commands of a process whose behavior is written as a
+    state machine: `step` is called to get each command and raises
+    StopIteration at the end. Unlike a generator, the state of such a
+    process lives in its attributes, so that the process can be copied and
+    pickled (see :meth:`Model.checkpoint \
+    <simso.core.Model.Model.checkpoint>`).
+    """
+    def __init__(self, step):
+        self.step = step
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.step()
+
+    next = __next__  # Python 2
+
+
+class Process(object):
+    """
+    Base class for the active objects of the simulation (processors and
+    tasks). The behavior of a process is an iterator of commands, usually a
+    generator or a :class:`StateMachine`, that is given to
+    :meth:`Model.activate <simso.core.Model.Model.activate>`.
+
+    The kernel in use does the bookkeeping; the attributes defined here are
+    those of the native kernel.
+    """
+
+    def __init__(self, name, sim):
+        """
+        Args:
+            - `name`: Name of the process.
+            - `sim`: The :class:`model <simso.core.Model.Model>` object.
+        """
+        self.name = name
+        self.sim = sim
+        self._kernel = sim.kernel
+        self._generator = None
+        self._next_time = None
+        self._rec = None
+        self._terminated = False
+        self._in_interrupt = False
+        self._interrupt_left = 0
+        self._cond = None
+        self._signal = None
+        self._wait_seq = 0
+
+    def interrupt(self, victim):
+        """
+        Interrupt the process `victim` if it is holding.
+        """
+        return self._kernel.interrupt(victim)
+
+    def interrupted(self):
+        """
+        Return True if the process was woken up by an interruption.
+        """
+        return self._kernel.interrupted(self)
+
+    def interruptReset(self):
+        """
+        Leave the interrupted state.
+        """
+        self._kernel.interrupt_reset(self)
+
+    @property
+    def interruptLeft(self):
+        """
+        Time that was left in the hold when the process was interrupted.
+        """
+        return self._kernel.interrupt_left(self)
+
+    def cancel(self, victim):
+        """
+        Cancel the pending wake-up of the process `victim`.
+        """
+        self._kernel.cancel(victim)
@@ -0,0 +1,25 @@
+# coding=utf-8
+
+
+class Signal(object):
+    """
+    Wake-up channel for processes waiting on a condition. A process waits
+    with ``yield waitsignal, self, signal, condition`` and whoever changes
+    the state the condition depends on calls :meth:`fire`. The condition is
+    only evaluated again after a fire, instead of after every event.
+    """
+
+    def __init__(self, sim):
+        """
+        Args:
+            - `sim`: The :class:`model <simso.core.Model.Model>` object.
+        """
+        self._kernel = sim.kernel
+        self._waiters = []
+
+    def fire(self):
+        """
+        Notify the waiting processes that their condition may have changed.
+        """
+        if self._waiters:
+            self._kernel.fire(self)
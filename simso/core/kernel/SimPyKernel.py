@@ -0,0 +1,121 @@
+# coding=utf-8
+
+from simso.core.kernel.AbstractKernel import AbstractKernel
+from simso.core.kernel.Process import hold, passivate, waituntil, \
+    waitsignal
+
+
+class SimPyKernel(AbstractKernel):
+    """
+    Kernel backed by SimPy 2.3.1, the engine historically used by SimSo. It
+    is kept to cross-check the results of the :class:`native kernel
+    <simso.core.kernel.NativeKernel.NativeKernel>`.
+
+    Every SimSo process is shadowed by a SimPy process that translates the
+    yielded commands. Callbacks are run by short-lived SimPy processes.
+    A ``waitsignal`` becomes a SimPy ``waituntil``: the condition is polled
+    after every event and the signals are ignored, which makes this kernel a
+    reference to check that no wake-up is missed by the native one.
+    """
+
+    def __init__(self):
+        try:
+            from SimPy import Simulation as simpy
+        except ImportError:
+            raise ImportError("The 'simpy' kernel requires SimPy 2.3.1 "
+                              "(pip install SimPy==2.3.1).")
+        self._simpy = simpy
+        self._sim = simpy.Simulation()
+        self.initialize()
+
+    def __getstate__(self):
+        raise TypeError("Only the native kernel can be checkpointed.")
+
+    def initialize(self):
+        self._sim.initialize()
+        self._system = self._simpy.Process(name="SimSo", sim=self._sim)
+
+    def now(self):
+        return self._sim.now()
+
+    def _proxy(self, process):
+        proxy = getattr(process, '_proxy', None)
+        if proxy is None:
+            proxy = self._simpy.Process(name=process.name, sim=self._sim)
+            process._proxy = proxy
+        return proxy
+
+    def _drive(self, proxy, generator):
+        simpy = self._simpy
+        for command in generator:
+            code = command[0]
+            if code == hold:
+                yield simpy.hold, proxy, command[2] if len(command) == 3 else 0
+            elif code == passivate:
+                yield simpy.passivate, proxy
+            elif code == waituntil:
+                yield simpy.waituntil, proxy, command[2]
+            elif code == waitsignal:
+                yield simpy.waituntil, proxy, command[3]
+            else:
+                raise ValueError("Unknown command {} yielded by {}".format(
+                    code, proxy.name))
+
+    def activate(self, process, generator, prior=False):
+        proxy = self._proxy(process)
+        self._sim.activate(proxy, self._drive(proxy, generator), prior=prior)
+
+    def reactivate(self, process, prior=False):
+        self._sim.reactivate(self._proxy(process), prior=prior)
+
+    def cancel(self, process):
+        self._sim._unpost(self._proxy(process))
+
+    def interrupt(self, victim):
+        return self._system.interrupt(self._proxy(victim))
+
+    def interrupted(self, process):
+        return self._proxy(process).interrupted()
+
+    def interrupt_reset(self, process):
+        self._proxy(process).interruptReset()
+
+    def interrupt_left(self, process):
+        return self._proxy(process).interruptLeft
+
+    def fire(self, signal):
+        pass
+
+    def _call(self, callback, args):
+        callback(*args)
+        return
+        yield
+
+    def schedule(self, delay, callback, args=(), prior=False):
+        proxy = self._simpy.Process(name="Callback", sim=self._sim)
+        self._sim.activate(proxy, self._call(callback, args), delay=delay,
+                           prior=prior)
+        return proxy
+
+    def unschedule(self, handle):
+        self._sim._unpost(handle)
+
+    def simulate(self, until, events=None):
+        sim = self._sim
+        sim._stop = False
+        if events is None:
+            sim.simulate(until=until)
+            return False
+        timestamps = sim._timestamps
+        while (events > 0 and not sim._stop and timestamps and
+               timestamps[0][0] <= until):
+            sim.step()
+            events -= 1
+        if events <= 0:
+            return True
+        if not sim._stop and timestamps:
+            sim._t = until
+        return False
+
+    def stop(self):
+        self._sim.stopSimulation()
@@ -0,0 +1,15 @@
+"""
+Discrete-event kernels. A :class:`Model <simso.core.Model.Model>` runs on the
+native kernel by default; the SimPy 2 kernel is kept to cross-check results.
+"""
+
+from .Process import Process, StateMachine, hold, passivate, waituntil, \
+    waitsignal
+from .Signal import Signal
+from .NativeKernel import NativeKernel
+from .SimPyKernel import SimPyKernel
+
+kernels = {
+    'native': NativeKernel,
+    'simpy': SimPyKernel
+}
@@ -1,6 +1,37 @@
+import copy
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from itertools import repeat
+
+import numpy as np
+
 from simso.core.ProcEvent import ProcEvent
 from simso.core.JobEvent import JobEvent
 from simso.core.SchedulerEvent import SchedulerEvent
+from simso.core.Trace import JobTrace, ProcessorTrace, TimerTrace, \
+    PROC_STATES, CONTEXT_SAVE, CONTEXT_SAVED, CONTEXT_LOAD, CONTEXT_LOADED, \
+    JOBS, PROCESSORS, SCHEDULER, TIMERS
+
+
+# State (ProcEvent.RUN, IDLE or OVERHEAD) entered with each code of the
+# processor traces, for the vectorized timelines.
+_STATE_OF_CODE = np.array([state or 0 for state in PROC_STATES], np.int8)
+
+# Kinds of intervals of the processor timelines, with their state.
+INTERVALS = (('busy', ProcEvent.RUN), ('idle', ProcEvent.IDLE),
+             ('overhead', ProcEvent.OVERHEAD))
+
+
+def _to_numpy(column, dtype):
+    """
+    Copy a column of a trace (an array or a column of a trace file) into a
+    NumPy array.
+    """
+    if isinstance(column, array):
+        return np.array(column, dtype)
+    return np.fromiter(column, dtype, len(column))
 
 
 class ProcessorR(object):
@@ -14,6 +45,20 @@ class ProcessorR(object):
         self.context_load_overhead = 0
         self.context_load_count = 0
 
+    def add_event(self, code, duration):
+        """
+        Account an event of the processor, `duration` cycles after the
+        previous one.
+        """
+        if code == CONTEXT_SAVED:
+            self.context_save_overhead += duration
+        elif code == CONTEXT_SAVE:
+            self.context_save_count += 1
+        elif code == CONTEXT_LOADED:
+            self.context_load_overhead += duration
+        elif code == CONTEXT_LOAD:
+            self.context_load_count += 1
+
 
 class SchedulerR(object):
     """
@@ -28,6 +73,183 @@ class SchedulerR(object):
         self.activate_count = 0
         self.terminate_count = 0
 
+    def add_event(self, code, duration):
+        """
+        Account an event of the scheduler, `duration` cycles after the
+        previous one.
+        """
+        if code == SchedulerEvent.BEGIN_SCHEDULE:
+            self.schedule_count += 1
+        elif code == SchedulerEvent.END_SCHEDULE:
+            self.schedule_overhead += duration
+        elif code == SchedulerEvent.BEGIN_ACTIVATE:
+            self.activate_count += 1
+        elif code == SchedulerEvent.END_ACTIVATE:
+            self.activate_overhead += duration
+        elif code == SchedulerEvent.BEGIN_TERMINATE:
+            self.terminate_count += 1
+        elif code == SchedulerEvent.END_TERMINATE:
+            self.terminate_overhead += duration
+
+
+class PeriodicList(object):
+    """
+    Read-only list of dated records (such as JobR) used by extrapolated
+    results. It is made of segments: a segment is a list of records repeated
+    `count` times, the dates of the k-th copy being shifted by
+    `shift + k * period`. The copies are only built when they are accessed.
+    """
+    def __init__(self, shift_record):
+        self._shift_record = shift_record
+        self._segments = []
+        self._len = 0
+
+    def add(self, records, count=1, shift=0, period=0):
+        if records and count > 0:
+            self._segments.append((records, count, shift, period))
+            self._len += len(records) * count
+
+    def _get(self, segment, index):
+        records, _, shift, period = segment
+        delta = shift + (index // len(records)) * period
+        record = records[index % len(records)]
+        if delta:
+            return self._shift_record(record, delta)
+        return record
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        for segment in self._segments:
+            for index in range(len(segment[0]) * segment[1]):
+                yield self._get(segment, index)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._len))]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("PeriodicList index out of range")
+        for segment in self._segments:
+            size = len(segment[0]) * segment[1]
+            if index < size:
+                return self._get(segment, index)
+            index -= size
+
+    def sum(self, key):
+        """
+        Sum of key(record) over the records. The key must not depend on the
+        dates, so that the copies are not built.
+        """
+        return sum(count * sum(key(record) for record in records)
+                   for records, count, _, _ in self._segments)
+
+
+def _sum(records, key):
+    if isinstance(records, PeriodicList):
+        return records.sum(key)
+    return sum(key(record) for record in records)
+
+
+def _shift_dated(entry, delta):
+    return (entry[0] + delta, entry[1].shifted(delta))
+
+
+class TraceIndex(object):
+    """
+    Prefix sums over the events of a trace, so that the metrics of a time
+    window are computed with two binary searches on the dates instead of a
+    pass over the events: the number of events of the `counted` codes, and
+    the time elapsed since the previous event for the events of the `timed`
+    codes.
+    """
+    def __init__(self, dates, codes, counted=(), timed=()):
+        self.dates = dates
+        self._codes = codes
+        self._counts = dict((code, array('q', [0])) for code in counted)
+        self._durations = dict((code, array('q', [0])) for code in timed)
+        last = 0
+        for date, code in zip(dates, codes):
+            for counted_code, counts in self._counts.items():
+                counts.append(counts[-1] + (code == counted_code))
+            for timed_code, durations in self._durations.items():
+                durations.append(durations[-1] + (
+                    date - last if code == timed_code else 0))
+            last = date
+
+    def bounds(self, window):
+        """
+        Indices of the first event of the window and of the first event
+        after it.
+        """
+        return (bisect_left(self.dates, window[0]),
+                bisect_right(self.dates, window[1]))
+
+    def count(self, code, bounds):
+        lo, hi = bounds
+        counts = self._counts[code]
+        return counts[hi] - counts[lo] if hi > lo else 0
+
+    def duration(self, code, bounds, start):
+        """
+        Time elapsed before the events `code` of the window, the first event
+        of the window being measured from the date `start`.
+        """
+        lo, hi = bounds
+        if hi <= lo:
+            return 0
+        durations = self._durations[code]
+        result = durations[hi] - durations[lo]
+        if self._codes[lo] == code:
+            previous = self.dates[lo - 1] if lo > 0 else 0
+            result += previous - start
+        return result
+
+
+class LoadIndex(object):
+    """
+    Time spent by a processor running jobs and in overheads, from the start
+    of the simulation to each of its events. The time spent in a window is
+    then the difference of two values found by binary search.
+    """
+    def __init__(self, dates, codes):
+        self.dates = dates
+        self._states = array('b')
+        self._run = array('q', [0])
+        self._overhead = array('q', [0])
+        state = ProcEvent.IDLE
+        last = 0
+        for date, code in zip(dates, codes):
+            run = self._run[-1]
+            overhead = self._overhead[-1]
+            if state == ProcEvent.RUN:
+                run += date - last
+            elif state == ProcEvent.OVERHEAD:
+                overhead += date - last
+            self._run.append(run)
+            self._overhead.append(overhead)
+            state = PROC_STATES[code]
+            self._states.append(state)
+            last = date
+
+    def at(self, date):
+        """
+        Time spent running and in overheads before `date`.
+        """
+        i = bisect_right(self.dates, date)
+        if i == 0:
+            return 0, 0
+        run = self._run[i]
+        overhead = self._overhead[i]
+        state = self._states[i - 1]
+        if state == ProcEvent.RUN:
+            run += date - self.dates[i - 1]
+        elif state == ProcEvent.OVERHEAD:
+            overhead += date - self.dates[i - 1]
+        return run, overhead
+
 
 class TaskR(object):
     """
@@ -40,7 +262,7 @@ class TaskR(object):
         self.task = task
         self.delta_preemption = delta_preemption
         self.jobs = []
-        self.waiting_jobs = []
+        self.waiting_jobs = deque()
         self.resumptions = []
         self.task_migrations = []
         self.abort_count = 0
@@ -60,7 +282,7 @@ class TaskR(object):
         if self.waiting_jobs:
             self.preempt(date)
             self.waiting_jobs[0].terminate(date)
-            self.waiting_jobs.pop(0)
+            self._end_job(self.waiting_jobs.popleft())
             if self.waiting_jobs:
                 self.waiting_jobs[0].start(date)
             self.preempt_date = None
@@ -69,7 +291,7 @@ class TaskR(object):
         if self.waiting_jobs:
             self.preempt(date)
             self.waiting_jobs[0].abort(date)
-            self.waiting_jobs.pop(0)
+            self._end_job(self.waiting_jobs.popleft())
             self.abort_count += 1
             if self.waiting_jobs:
                 self.waiting_jobs[0].start(date)
@@ -79,9 +301,9 @@ class TaskR(object):
         if self.waiting_jobs:
             if self.waiting_jobs[0].computation_time == 0:
                 if self.cpu == cpu or self.cpu is None:
-                    self.resumptions.append((date, self.waiting_jobs[0]))
+                    self._add_resumption(date, self.waiting_jobs[0])
                 else:
-                    self.task_migrations.append((date, self.waiting_jobs[0]))
+                    self._add_task_migration(date, self.waiting_jobs[0])
             else:
                 if self.cpu == cpu:
                     self.waiting_jobs[0].preemption_count += 1
@@ -106,6 +328,19 @@ class TaskR(object):
         self.preempt_date = date
         self.other_executed = False
 
+    def _end_job(self, jobr):
+        pass
+
+    def _add_resumption(self, date, jobr):
+        self.resumptions.append((date, jobr))
+
+    def _add_task_migration(self, date, jobr):
+        self.task_migrations.append((date, jobr))
+
+    @property
+    def job_count(self):
+        return len(self.jobs)
+
     @property
     def resumption_count(self):
         return len(self.resumptions)
@@ -116,29 +351,209 @@ class TaskR(object):
 
     @property
     def exceeded_count(self):
-        count = 0
-        for job in self.jobs:
-            if job.exceeded_deadline:
-                count += 1
-        return count
+        return _sum(self.jobs, lambda job: 1 if job.exceeded_deadline else 0)
 
     @property
     def migration_count(self):
-        return sum(job.migration_count for job in self.jobs)
+        return _sum(self.jobs, lambda job: job.migration_count)
 
     @property
     def preemption_count(self):
-        return sum(job.preemption_count for job in self.jobs)
+        return _sum(self.jobs, lambda job: job.preemption_count)
 
     @property
     def preemption_inter_count(self):
-        return sum(job.preemption_inter_count for job in self.jobs)
+        return _sum(self.jobs, lambda job: job.preemption_inter_count)
+
+    def _response_times(self):
+        return [job.response_time for job in self.jobs
+                if job.response_time is not None]
+
+    @property
+    def max_response_time(self):
+        """
+        Maximum response time of the finished jobs, in cycles (None if no
+        job finished).
+        """
+        response_times = self._response_times()
+        return max(response_times) if response_times else None
+
+    @property
+    def mean_response_time(self):
+        """
+        Mean response time of the finished jobs, in cycles (None if no job
+        finished).
+        """
+        response_times = self._response_times()
+        if not response_times:
+            return None
+        return float(sum(response_times)) / len(response_times)
 
     @property
     def name(self):
         return self.task.name
 
 
+class OnlineTaskR(TaskR):
+    """
+    TaskR of the :class:`OnlineResults`. The JobR are only kept while their
+    job is active: the metrics of the finished jobs are accumulated when
+    they end, so that the memory does not depend on the number of jobs.
+    The lists of the jobs, of the resumptions and of the task migrations
+    are thus not available, only the counts.
+    """
+    def __init__(self, task, delta_preemption=100):
+        self.task = task
+        self.delta_preemption = delta_preemption
+        self.waiting_jobs = deque()
+        self.abort_count = 0
+        self.execute_date = None
+        self.preempt_date = None
+        self.cpu = None
+        self.other_executed = False
+        self._job_count = 0
+        self._resumption_count = 0
+        self._task_migration_count = 0
+        # Metrics of the finished jobs.
+        self._exceeded_count = 0
+        self._migration_count = 0
+        self._preemption_count = 0
+        self._preemption_inter_count = 0
+        self._response_time_count = 0
+        self._response_time_sum = 0
+        self._max_response_time = None
+
+    def add_job(self, date, job):
+        jobr = JobR(date, job)
+        self._job_count += 1
+        self.waiting_jobs.append(jobr)
+        if len(self.waiting_jobs) == 1:
+            jobr.start(date)
+
+    def _end_job(self, jobr):
+        if jobr.exceeded_deadline:
+            self._exceeded_count += 1
+        self._migration_count += jobr.migration_count
+        self._preemption_count += jobr.preemption_count
+        self._preemption_inter_count += jobr.preemption_inter_count
+        self._response_time_count += 1
+        self._response_time_sum += jobr.response_time
+        if self._max_response_time is None or \
+                jobr.response_time > self._max_response_time:
+            self._max_response_time = jobr.response_time
+
+    def _add_resumption(self, date, jobr):
+        self._resumption_count += 1
+
+    def _add_task_migration(self, date, jobr):
+        self._task_migration_count += 1
+
+    def _not_kept(self, what):
+        raise ValueError("The {} are not kept by the online results."
+                         .format(what))
+
+    @property
+    def jobs(self):
+        self._not_kept("jobs")
+
+    @property
+    def resumptions(self):
+        self._not_kept("resumptions")
+
+    @property
+    def task_migrations(self):
+        self._not_kept("task migrations")
+
+    @property
+    def job_count(self):
+        return self._job_count
+
+    @property
+    def resumption_count(self):
+        return self._resumption_count
+
+    @property
+    def task_migration_count(self):
+        return self._task_migration_count
+
+    @property
+    def exceeded_count(self):
+        return self._exceeded_count
+
+    @property
+    def migration_count(self):
+        return self._migration_count + sum(
+            job.migration_count for job in self.waiting_jobs)
+
+    @property
+    def preemption_count(self):
+        return self._preemption_count + sum(
+            job.preemption_count for job in self.waiting_jobs)
+
+    @property
+    def preemption_inter_count(self):
+        return self._preemption_inter_count + sum(
+            job.preemption_inter_count for job in self.waiting_jobs)
+
+    @property
+    def max_response_time(self):
+        return self._max_response_time
+
+    @property
+    def mean_response_time(self):
+        if not self._response_time_count:
+            return None
+        return float(self._response_time_sum) / self._response_time_count
+
+
+class TaskIndex(TaskR):
+    """
+    TaskR that also records the date of each preemption and migration of
+    the jobs, with the number of the job (in the order of the activations),
+    from a replay of all the events of the task. The jobs being accounted
+    in the order of their activations, the dates and the numbers are both
+    sorted: the count of an observation window is then found with binary
+    searches.
+    """
+    # Counts of the JobR that are indexed.
+    METRICS = ('preemption_count', 'preemption_inter_count',
+               'migration_count')
+
+    def __init__(self, task, delta_preemption=100):
+        TaskR.__init__(self, task, delta_preemption)
+        self.activations = array('q')
+        self._counted = dict((metric, (array('q'), array('i')))
+                             for metric in self.METRICS)
+
+    def add_job(self, date, job):
+        TaskR.add_job(self, date, job)
+        self.activations.append(date)
+
+    def execute(self, date, cpu):
+        if not self.waiting_jobs:
+            TaskR.execute(self, date, cpu)
+            return
+        jobr = self.waiting_jobs[0]
+        before = [getattr(jobr, metric) for metric in self.METRICS]
+        TaskR.execute(self, date, cpu)
+        number = len(self.activations) - len(self.waiting_jobs) + 1
+        for metric, count in zip(self.METRICS, before):
+            if getattr(jobr, metric) > count:
+                dates, numbers = self._counted[metric]
+                dates.append(date)
+                numbers.append(number)
+
+    def count(self, metric, window):
+        """
+        The `metric` summed over the jobs activated in the `window`, for
+        their events in the window.
+        """
+        dates, numbers = self._counted[metric]
+        first = bisect_left(self.activations, window[0]) + 1
+        return max(0, bisect_right(dates, window[1]) -
+                   bisect_left(numbers, first))
+
+
 class JobR(object):
     """
     Add a set of metrics to a job. Such metrics include: preemption count,
@@ -174,6 +589,19 @@ class JobR(object):
     def start(self, date):
         self.start_date = date
 
+    def shifted(self, delta):
+        """
+        Return a copy of this JobR with its dates shifted by delta cycles.
+        """
+        jobr = copy.copy(self)
+        jobr.activation_date += delta
+        jobr.absolute_deadline += delta
+        if jobr.start_date is not None:
+            jobr.start_date += delta
+        if jobr.end_date is not None:
+            jobr.end_date += delta
+        return jobr
+
     @property
     def name(self):
         return self.job.name
@@ -204,147 +632,454 @@ class Results(object):
         - `processors`: a dictionary of ProcessorR where the key is the \
             original Processor.
 
-    .
+    The metrics can only be computed from the traces that were recorded
+    (see the `trace` argument of the :class:`Model
+    <simso.core.Model.Model>`): the tasks and the derived counts (deadline
+    misses, preemptions, migrations) need the "jobs" trace, the scheduler
+    the "scheduler" trace, the processors, :meth:`calc_load`,
+    :meth:`intervals` and :meth:`utilisation` the "processors" trace, the
+    timers the "timers" trace. Reading a metric whose trace is missing
+    raises a ValueError.
+
+    When the simulation was stopped in its :class:`steady state \
+    <simso.core.SteadyState.SteadyState>`, the metrics are extrapolated to
+    the end of the observation window (by default, the duration of the
+    simulation). The lists of the TaskR (jobs, resumptions and
+    task_migrations) are then :class:`PeriodicList` objects whose records
+    beyond the simulated part are copies of the records of the steady state,
+    with shifted dates.
     """
+    # Class of the metrics of the tasks.
+    _task_class = TaskR
+
     def __init__(self, model):
         self.model = model
         self.error = None
         self._observation_window = None
 
-        self.tasks = {}
-        self.scheduler = None
-        self.processors = {}
-        self.total_timers = 0
-        self.timers = None
+        self._tasks = {}
+        self._scheduler = None
+        self._processors = {}
+        self._total_timers = 0
+        self._timers = None
+        # The metrics computed for the current observation window, and the
+        # indexes of the traces.
+        self._analyzed = set()
+        self._indexes = {}
 
     def end(self):
-        self._analyze()
+        self._analyzed = set()
+
+    def _require(self, trace, metrics):
+        if trace not in self.model.trace:
+            raise ValueError(
+                "The {} are not available: the \"{}\" trace was not "
+                "recorded (see the trace argument of the Model).".format(
+                    metrics, trace))
+
+    @property
+    def tasks(self):
+        """
+        Dictionary of the TaskR, by task. Requires the "jobs" trace.
+        """
+        self._require(JOBS, "metrics of the tasks")
+        self._analyze('tasks')
+        return self._tasks
+
+    @property
+    def scheduler(self):
+        """
+        The SchedulerR. Requires the "scheduler" trace.
+        """
+        self._require(SCHEDULER, "metrics of the scheduler")
+        self._analyze('scheduler')
+        return self._scheduler
+
+    @property
+    def processors(self):
+        """
+        Dictionary of the ProcessorR, by processor. Requires the
+        "processors" trace.
+        """
+        self._require(PROCESSORS, "metrics of the processors")
+        self._analyze('processors')
+        return self._processors
+
+    @property
+    def timers(self):
+        """
+        Number of timers fired on each processor. Requires the "timers"
+        trace.
+        """
+        self._require(TIMERS, "timer counts")
+        self._analyze('timers')
+        return self._timers
+
+    @property
+    def total_timers(self):
+        """
+        Number of timers fired. Requires the "timers" trace.
+        """
+        self._require(TIMERS, "timer counts")
+        self._analyze('timers')
+        return self._total_timers
+
+    def _task_events(self, window=None):
+        """
+        The events of the tasks as (id, date, code, job, cpu, task) tuples,
+        sorted by their sequence number. The traces of the tasks are merged
+        with a heap, the jobs are given by their number in their task and
+        the processors by their internal id. If a `window` is given, only
+        its events are read.
+        """
+        self._require(JOBS, "events of the tasks")
+        traces = []
+        for task in self.model.task_list:
+            trace = task.monitor
+            if window is None:
+                lo, hi = 0, len(trace)
+            else:
+                lo = bisect_left(trace.dates, window[0])
+                hi = bisect_right(trace.dates, window[1])
+            traces.append(zip(trace.ids[lo:hi], trace.dates[lo:hi],
+                              trace.codes[lo:hi], trace.jobs[lo:hi],
+                              trace.cpus[lo:hi], repeat(task)))
+        return heapq.merge(*traces)
 
     def tasks_event(self):
         """
         Generator of the tasks events sorted by their date.
         """
-        monitors = {}
-        indices = {}
-        for task in self.model.task_list:
-            monitors[task] = task.monitor
-            indices[task] = 0
-
-        while True:
-            m = None
-            for task in self.model.task_list:
-                if indices[task] < len(monitors[task]):
-                    evt = monitors[task][indices[task]]
-                    if m is None or evt[1].id_ < m[0][1].id_:
-                        m = (evt, task)
-            if m is None:
-                break
-            indices[m[1]] += 1
-            yield m
-
-    def _generate_tasks(self):
-        self.tasks = {}
+        model = self.model
+        processors = model.processors
+        for id_, date, code, job, cpu, task in self._task_events():
+            evt = JobEvent(model.traced_job(task._internal_id, job), code,
+                           processors[cpu] if cpu >= 0 else None, id_=id_)
+            yield [date, evt], task
 
+    def _new_tasks(self, task_class=None):
+        task_class = task_class or self._task_class
+        self._tasks = {}
         for task in self.model.task_list:
-            self.tasks[task] = TaskR(task)
+            self._tasks[task] = task_class(task)
+        # The preempted TaskR, by processor, that are notified when another
+        # task executes on their processor. A TaskR is removed once notified
+        # and registered again after its next event if it is still
+        # preempted.
+        self._preempted = {}
+        self._registered = {}
 
-        for evt, task in self.tasks_event():
-            if (evt[0] < self.observation_window[0] or
-                    evt[0] > self.observation_window[1]):
-                # The events that start before the observation window should
-                # maybe be stored...
-                continue
-            if evt[1].event == JobEvent.ACTIVATE:
-                self.tasks[task].add_job(evt[0], evt[1].job)
-            elif evt[1].event == JobEvent.TERMINATED:
-                self.tasks[task].terminate_job(evt[0])
-            elif evt[1].event == JobEvent.ABORTED:
-                self.tasks[task].abort_job(evt[0])
-            elif evt[1].event == JobEvent.EXECUTE:
-                self.tasks[task].execute(evt[0], evt[1].cpu)
-                for rt in self.tasks.values():
-                    if rt.preempt_date and evt[1].cpu == rt.cpu:
-                        rt.other_executed = True
-            elif evt[1].event == JobEvent.PREEMPTED:
-                self.tasks[task].preempt(evt[0])
+    def _add_task_event(self, task_r, date, code, job, cpu):
+        """
+        Account the event `code` of the task of `task_r`. The `job` is only
+        used by the activations, the processor `cpu` by the executions.
+        """
+        if code == JobEvent.ACTIVATE:
+            task_r.add_job(date, job)
+        elif code == JobEvent.TERMINATED:
+            task_r.terminate_job(date)
+        elif code == JobEvent.ABORTED:
+            task_r.abort_job(date)
+        elif code == JobEvent.EXECUTE:
+            task_r.execute(date, cpu)
+        elif code == JobEvent.PREEMPTED:
+            task_r.preempt(date)
 
-    def _generate_scheduler(self):
-        self.scheduler = SchedulerR()
-        last = self.observation_window[0]
-        for t, evt in self.model.scheduler.monitor:
-            if (t < self.observation_window[0] or
-                    t > self.observation_window[1]):
+        preempted = self._preempted
+        registered = self._registered
+        if task_r in registered:
+            preempted[registered.pop(task_r)].discard(task_r)
+        if task_r.preempt_date:
+            registered[task_r] = task_r.cpu
+            preempted.setdefault(task_r.cpu, set()).add(task_r)
+
+        if code == JobEvent.EXECUTE:
+            self._notify_execute(cpu)
+
+    def _notify_execute(self, cpu):
+        """
+        Notify the TaskR preempted on `cpu` that another task executes.
+        """
+        registered = self._registered
+        for task_r in self._preempted.pop(cpu, ()):
+            task_r.other_executed = True
+            del registered[task_r]
+
+    def _generate_tasks(self, task_class=None):
+        self._new_tasks(task_class)
+        if JOBS not in self.model.trace:
+            return
+        model = self.model
+        processors = model.processors
+        self._seed_tasks()
+        # Number of the first job of each task activated in the window. The
+        # jobs of a task are activated in the order of their numbers.
+        first = {}
+        for _, date, code, number, cpu, task in self._task_events(
+                self.observation_window):
+            cpu = processors[cpu] if cpu >= 0 else None
+            job = None
+            if code == JobEvent.ACTIVATE:
+                job = model.traced_job(task._internal_id, number, date)
+                first.setdefault(task, number)
+            elif number < first.get(task, number + 1):
+                # The job is not in the window: only its executions are
+                # taken into account, for the other jobs.
+                if code == JobEvent.EXECUTE:
+                    self._tasks[task].cpu = cpu
+                    self._notify_execute(cpu)
                 continue
+            self._add_task_event(self._tasks[task], date, code, job, cpu)
 
-            if evt.event == SchedulerEvent.BEGIN_SCHEDULE:
-                self.scheduler.schedule_count += 1
-            elif evt.event == SchedulerEvent.END_SCHEDULE:
-                self.scheduler.schedule_overhead += t - last
-            elif evt.event == SchedulerEvent.BEGIN_ACTIVATE:
-                self.scheduler.activate_count += 1
-            elif evt.event == SchedulerEvent.END_ACTIVATE:
-                self.scheduler.activate_overhead += t - last
-            elif evt.event == SchedulerEvent.BEGIN_TERMINATE:
-                self.scheduler.terminate_count += 1
-            elif evt.event == SchedulerEvent.END_TERMINATE:
-                self.scheduler.terminate_overhead += t - last
-            last = t
+    def _seed_tasks(self):
+        """
+        Set the processor of the tasks to the one of their last execution
+        before the observation window, so that the first job of a task in
+        the window is counted as a migration if it starts elsewhere. The
+        other fields of a TaskR are reset by the first execution of its
+        jobs.
+        """
+        w0 = self.observation_window[0]
+        if w0 <= 0:
+            return
+        processors = self.model.processors
+        for task, task_r in self._tasks.items():
+            trace = task.monitor
+            codes = trace.codes
+            for index in range(bisect_left(trace.dates, w0) - 1, -1, -1):
+                if codes[index] == JobEvent.EXECUTE:
+                    task_r.cpu = processors[trace.cpus[index]]
+                    break
+
+    def _index(self, trace, index_class, *args):
+        """
+        Index of the trace, built on the first call.
+        """
+        key = (trace, index_class)
+        if key not in self._indexes:
+            self._indexes[key] = index_class(trace.dates, trace.codes, *args)
+        return self._indexes[key]
+
+    def _task_indexes(self):
+        """
+        The TaskIndex of the tasks, built on the first call by replaying
+        all the events of the tasks.
+        """
+        if TaskIndex not in self._indexes:
+            tasks = self._tasks
+            observation_window = self._observation_window
+            self._observation_window = (0, self.model.now())
+            try:
+                self._generate_tasks(TaskIndex)
+                self._indexes[TaskIndex] = self._tasks
+            finally:
+                self._tasks = tasks
+                self._observation_window = observation_window
+        return self._indexes[TaskIndex]
+
+    def _task_count(self, metric):
+        """
+        The `metric` (preemption_count, preemption_inter_count or
+        migration_count) summed over the tasks. Unless the results are
+        extrapolated, it is found in the indexes of the tasks, without
+        computing the metrics of the tasks for the observation window.
+        """
+        if self.extrapolated:
+            return sum(getattr(task_r, metric)
+                       for task_r in self.tasks.values())
+        self._require(JOBS, "metrics of the tasks")
+        window = self.observation_window
+        return sum(index.count(metric, window)
+                   for index in self._task_indexes().values())
+
+    def _generate_scheduler(self):
+        self._scheduler = SchedulerR()
+        index = self._index(
+            self.model.scheduler.monitor, TraceIndex,
+            (SchedulerEvent.BEGIN_SCHEDULE, SchedulerEvent.BEGIN_ACTIVATE,
+             SchedulerEvent.BEGIN_TERMINATE),
+            (SchedulerEvent.END_SCHEDULE, SchedulerEvent.END_ACTIVATE,
+             SchedulerEvent.END_TERMINATE))
+        bounds = index.bounds(self.observation_window)
+        w0 = self.observation_window[0]
+        scheduler = self._scheduler
+        scheduler.schedule_count = index.count(
+            SchedulerEvent.BEGIN_SCHEDULE, bounds)
+        scheduler.schedule_overhead = index.duration(
+            SchedulerEvent.END_SCHEDULE, bounds, w0)
+        scheduler.activate_count = index.count(
+            SchedulerEvent.BEGIN_ACTIVATE, bounds)
+        scheduler.activate_overhead = index.duration(
+            SchedulerEvent.END_ACTIVATE, bounds, w0)
+        scheduler.terminate_count = index.count(
+            SchedulerEvent.BEGIN_TERMINATE, bounds)
+        scheduler.terminate_overhead = index.duration(
+            SchedulerEvent.END_TERMINATE, bounds, w0)
 
     def _generate_processors(self):
-        self.processors = {}
+        self._processors = {}
+        w0 = self.observation_window[0]
         for proc in self.model.processors:
             proc_r = ProcessorR()
-            self.processors[proc] = proc_r
-            last = self.observation_window[0]
-            for t, evt in proc.monitor:
-                if (t < self.observation_window[0] or
-                        t > self.observation_window[1]):
-                    continue
-                if evt.event == ProcEvent.OVERHEAD and evt.args == "CS":
-                    if evt.terminated:
-                        proc_r.context_save_overhead += t - last
-                    else:
-                        proc_r.context_save_count += 1
-                if evt.event == ProcEvent.OVERHEAD and evt.args == "CL":
-                    if evt.terminated:
-                        proc_r.context_load_overhead += t - last
-                    else:
-                        proc_r.context_load_count += 1
-                last = t
-
-    def _compute_timers(self):
-        self.total_timers = 0
-        self.timers = {}
+            self._processors[proc] = proc_r
+            index = self._index(proc.monitor, TraceIndex,
+                                (CONTEXT_SAVE, CONTEXT_LOAD),
+                                (CONTEXT_SAVED, CONTEXT_LOADED))
+            bounds = index.bounds(self.observation_window)
+            proc_r.context_save_count = index.count(CONTEXT_SAVE, bounds)
+            proc_r.context_save_overhead = index.duration(
+                CONTEXT_SAVED, bounds, w0)
+            proc_r.context_load_count = index.count(CONTEXT_LOAD, bounds)
+            proc_r.context_load_overhead = index.duration(
+                CONTEXT_LOADED, bounds, w0)
+
+    def _generate_timers(self):
+        self._total_timers = 0
+        self._timers = {}
+        w0, w1 = self.observation_window
         for proc in self.model.processors:
-            self.timers[proc] = 0
-            for t, evt in proc.timer_monitor:
-                if (t < self.observation_window[0] or
-                        t > self.observation_window[1]):
-                    continue
-                self.total_timers += 1
-                self.timers[proc] += 1
-
-    def _analyze(self):
-        self._generate_tasks()
-        self._generate_scheduler()
-        self._generate_processors()
-        self._compute_timers()
+            dates = proc.timer_monitor.dates
+            self._timers[proc] = (bisect_right(dates, w1) -
+                                  bisect_left(dates, w0))
+            self._total_timers += self._timers[proc]
+
+    def _analyze(self, part):
+        """
+        Compute the metrics of the `part` ("tasks", "scheduler",
+        "processors" or "timers") for the observation window, unless it is
+        already done.
+        """
+        if part in self._analyzed:
+            return
+        if self.extrapolated:
+            self._extrapolate()
+            self._analyzed.update(('tasks', 'scheduler', 'processors',
+                                   'timers'))
+        else:
+            getattr(self, '_generate_' + part)()
+            self._analyzed.add(part)
+
+    def _analyze_window(self, window):
+        observation_window = self._observation_window
+        self._observation_window = window
+        try:
+            self._generate_tasks()
+            self._generate_scheduler()
+            self._generate_processors()
+            self._generate_timers()
+        finally:
+            self._observation_window = observation_window
+        return (self._tasks, self._scheduler, self._processors, self._timers,
+                self._total_timers)
+
+    def _extrapolate(self):
+        """
+        The events of [start, end) repeat every period. A counter c(t) over
+        the observation window [w0, w1] is thus given by:
+        c(end-) + n * (c(end-) - c(start-)) + (c(start + r) - c(start-)),
+        with w1 = end + n * period + r.
+        """
+        steady = self.model.steady_state
+        w0, w1 = self.observation_window
+        self._check_window()
+        start, end = steady.start, steady.end
+        n, r = divmod(w1 - end, steady.period)
+        n = int(n)
+        shift = (n + 1) * steady.period
+
+        def extrapolate(before, prefix, tail):
+            return prefix + n * (prefix - before) + (tail - before)
+
+        before = self._analyze_window((w0, start - 1))
+        tail = self._analyze_window((w0, start + r))
+        prefix = self._analyze_window((w0, end - 1))
+
+        for task, task_r in self._tasks.items():
+            tail_r = tail[0][task]
+            jobs = PeriodicList(JobR.shifted)
+            jobs.add([j for j in task_r.jobs if j.end_date is not None])
+            jobs.add([j for j in task_r.jobs
+                      if j.end_date is not None and j.end_date >= start],
+                     n, steady.period, steady.period)
+            jobs.add([j for j in tail_r.jobs
+                      if j.end_date is not None and j.end_date >= start],
+                     1, shift)
+            jobs.add([j for j in tail_r.jobs if j.end_date is None], 1, shift)
+            task_r.jobs = jobs
+
+            for attr in ('resumptions', 'task_migrations'):
+                entries = PeriodicList(_shift_dated)
+                entries.add(getattr(task_r, attr))
+                entries.add([e for e in getattr(task_r, attr)
+                             if e[0] >= start],
+                            n, steady.period, steady.period)
+                entries.add([e for e in getattr(tail_r, attr)
+                             if e[0] >= start], 1, shift)
+                setattr(task_r, attr, entries)
+
+            task_r.abort_count = extrapolate(
+                before[0][task].abort_count, task_r.abort_count,
+                tail_r.abort_count)
+
+        for attr in vars(self._scheduler):
+            setattr(self._scheduler, attr, extrapolate(
+                getattr(before[1], attr), getattr(prefix[1], attr),
+                getattr(tail[1], attr)))
+
+        for proc, proc_r in self._processors.items():
+            for attr in vars(proc_r):
+                setattr(proc_r, attr, extrapolate(
+                    getattr(before[2][proc], attr), getattr(proc_r, attr),
+                    getattr(tail[2][proc], attr)))
+            self._timers[proc] = extrapolate(
+                before[3][proc], prefix[3][proc], tail[3][proc])
+
+        self._total_timers = extrapolate(before[4], prefix[4], tail[4])
+
+    def _check_window(self):
+        steady = self.model.steady_state
+        if self.extrapolated and self.observation_window[0] > steady.origin:
+            raise ValueError(
+                "The results are extrapolated from a steady state: the "
+                "observation window must not start after {} cycles.".format(
+                    steady.origin))
+
+    @property
+    def extrapolated(self):
+        """
+        True if the metrics are extrapolated from the steady state of the
+        simulation.
+        """
+        steady = self.model.steady_state
+        return (steady is not None and steady.detected and
+                self.observation_window[1] >= steady.end)
 
     def get_observation_window(self):
         """
         Get the observation window.
         """
         if self._observation_window is None:
-            self._observation_window = (0, self.model.now())
+            steady = self.model.steady_state
+            if steady is not None and steady.detected:
+                self._observation_window = (0, self.model.duration)
+            else:
+                self._observation_window = (0, self.model.now())
         return self._observation_window
 
     def set_observation_window(self, window):
         """
         Set the observation window. The events that occurs outside of the
-        observation window are discarded.
+        observation window are discarded. The metrics are computed again
+        when they are read: those of the scheduler, the processors and the
+        timers, the loads and the total preemptions and migrations with a
+        few binary searches in the traces and their indexes, those of the
+        tasks from the events of the window (and the processor of the last
+        execution of each task before the window). The jobs activated before
+        the window are not part of the metrics of the tasks.
         """
         self._observation_window = window
-        self._analyze()
+        self._analyzed = set()
+        self._check_window()
 
     observation_window = property(get_observation_window,
                                   set_observation_window)
@@ -355,17 +1090,11 @@ class Results(object):
 
     @property
     def total_migrations(self):
-        migrations = 0
-        for task in self.tasks.values():
-            migrations += task.migration_count
-        return migrations
+        return self._task_count('migration_count')
 
     @property
     def total_preemptions(self):
-        preemptions = 0
-        for task in self.tasks.values():
-            preemptions += task.preemption_count
-        return preemptions
+        return self._task_count('preemption_count')
 
     @property
     def total_task_migrations(self):
@@ -388,36 +1117,282 @@ class Results(object):
             count += task.exceeded_count
         return count
 
+    def _load(self, proc, window):
+        index = self._index(proc.monitor, LoadIndex)
+        run_start, overhead_start = index.at(window[0])
+        run_end, overhead_end = index.at(window[1])
+        return run_end - run_start, overhead_end - overhead_start
+
     def calc_load(self):
         """
-        Yield a tuple (proc, load, overhead) for each processor.
+        Yield a tuple (proc, load, overhead) for each processor. Requires
+        the "processors" trace.
         """
-        for proc in self.model.processors:
-            sum_run = 0
-            sum_overhead = 0
-            last_event = ProcEvent.IDLE
-            x1 = self.observation_window[0]
-            for evt in proc.monitor:
-                current_date = evt[0]
-                if current_date < self.observation_window[0]:
-                    last_event = evt[1].event
-                    continue
-                if current_date >= self.observation_window[1]:
-                    break
-
-                if last_event == ProcEvent.RUN:
-                    sum_run += current_date - x1
-                elif last_event == ProcEvent.OVERHEAD:
-                    sum_overhead += current_date - x1
+        self._require(PROCESSORS, "loads of the processors")
+        w0, w1 = self.observation_window
+        extrapolated = self.extrapolated
+        if extrapolated:
+            steady = self.model.steady_state
+            n, r = divmod(w1 - steady.end, steady.period)
 
-                x1 = current_date
-                last_event = evt[1].event
-
-            if last_event == ProcEvent.RUN:
-                sum_run += self.observation_window[1] - x1
-            elif last_event == ProcEvent.OVERHEAD:
-                sum_overhead += self.observation_window[1] - x1
+        for proc in self.model.processors:
+            if extrapolated:
+                before = self._load(proc, (w0, steady.start))
+                tail = self._load(proc, (w0, steady.start + r))
+                prefix = self._load(proc, (w0, steady.end))
+                sum_run, sum_overhead = (
+                    prefix[i] + n * (prefix[i] - before[i]) +
+                    (tail[i] - before[i]) for i in (0, 1))
+            else:
+                sum_run, sum_overhead = self._load(proc, (w0, w1))
 
             yield (proc,
                    float(sum_run) / self.observation_window_duration,
                    float(sum_overhead) / self.observation_window_duration)
+
+    def _timeline(self, proc):
+        """
+        Successive states of the processor over the observation window, as
+        three NumPy arrays: the start and end dates of the intervals and
+        the state during each of them. The intervals of the same state are
+        merged and those of zero length are dropped.
+        """
+        if self.extrapolated:
+            raise ValueError(
+                "The timelines of the processors are not available for the "
+                "results extrapolated from a steady state.")
+        w0, w1 = self.observation_window
+        trace = proc.monitor
+        dates = _to_numpy(trace.dates, np.int64)
+        states = _STATE_OF_CODE[_to_numpy(trace.codes, np.intp)]
+        lo = np.searchsorted(dates, w0, 'right')
+        hi = np.searchsorted(dates, w1, 'right')
+        first = states[lo - 1] if lo > 0 else ProcEvent.IDLE
+        starts = np.concatenate(([w0], dates[lo:hi]))
+        ends = np.concatenate((dates[lo:hi], [w1]))
+        states = np.concatenate(([first], states[lo:hi]))
+
+        kept = ends > starts
+        starts, ends, states = starts[kept], ends[kept], states[kept]
+        if len(states) == 0:
+            return starts, ends, states
+        changes = np.flatnonzero(states[1:] != states[:-1]) + 1
+        return (starts[np.concatenate(([0], changes))],
+                ends[np.concatenate((changes - 1, [len(ends) - 1]))],
+                states[np.concatenate(([0], changes))])
+
+    def intervals(self):
+        """
+        Return the busy, idle and overhead intervals of all the processors
+        over the observation window, as a dictionary whose keys are
+        "busy", "idle" and "overhead". Each value is a NumPy array with one
+        row per interval: the index of the processor in the list of the
+        model, the start and the end date of the interval (in cycles).
+        Requires the "processors" trace; not available when the results are
+        extrapolated.
+        """
+        self._require(PROCESSORS, "timelines of the processors")
+        parts = dict((name, []) for name, _ in INTERVALS)
+        for i, proc in enumerate(self.model.processors):
+            starts, ends, states = self._timeline(proc)
+            for name, state in INTERVALS:
+                selected = states == state
+                parts[name].append(np.column_stack((
+                    np.full(np.count_nonzero(selected), i, np.int64),
+                    starts[selected], ends[selected])))
+        return dict((name, np.concatenate(arrays) if arrays
+                     else np.empty((0, 3), np.int64))
+                    for name, arrays in parts.items())
+
+    def utilisation(self, resolution, kind='busy'):
+        """
+        Return the utilisation of all the processors over time, as a tuple
+        (edges, series). The observation window is cut into buckets of
+        `resolution` cycles (the last one can be shorter); `edges` is the
+        NumPy array of their limits and `series` a NumPy array with one row
+        per processor and one column per bucket: the fraction of the bucket
+        spent in the intervals of the given `kind` ("busy", "idle" or
+        "overhead"). Requires the "processors" trace; not available when the
+        results are extrapolated.
+        """
+        self._require(PROCESSORS, "timelines of the processors")
+        states = dict(INTERVALS)
+        if kind not in states:
+            raise ValueError("Unknown kind of interval: {}".format(kind))
+        if resolution <= 0:
+            raise ValueError("The resolution must be positive.")
+        w0, w1 = self.observation_window
+        edges = np.append(np.arange(w0, w1, resolution, dtype=np.int64), w1)
+        series = np.zeros((len(self.model.processors), len(edges) - 1))
+        for i, proc in enumerate(self.model.processors):
+            starts, ends, proc_states = self._timeline(proc)
+            selected = proc_states == states[kind]
+            starts, lengths = starts[selected], (ends - starts)[selected]
+            if len(starts) == 0:
+                continue
+            # Time spent in the state before each edge: the intervals that
+            # ended before it, plus the part of the current one.
+            elapsed = np.concatenate(([0], np.cumsum(lengths)))
+            k = np.searchsorted(starts, edges, 'right') - 1
+            current = np.maximum(k, 0)
+            before = np.where(
+                k >= 0, elapsed[current] + np.clip(
+                    edges - starts[current], 0, lengths[current]), 0)
+            series[i] = np.diff(before) / np.diff(edges)
+        return edges, series
+
+
+class OnlineResults(Results):
+    """
+    Results computed during the simulation. They are the sink of the traces
+    of the model, with chunks of one event: each event is accounted as soon
+    as it is recorded and is not kept. The results are thus ready when the
+    simulation ends, without replaying the traces, and their memory does
+    not depend on the duration of the simulation: the metrics of the tasks
+    are :class:`OnlineTaskR` objects, which only keep the active jobs, and
+    the finished jobs of a task are freed when its next job is activated
+    (see :meth:`GenericTask.free_finished_jobs
+    <simso.core.Task.GenericTask.free_finished_jobs>`).
+
+    The observation window is the simulated part and cannot be changed, the
+    results are not extrapolated from a steady state and
+    :meth:`tasks_event` is not available. The model uses them when its
+    `online_results` argument is True.
+    """
+    chunk_size = 1
+    _task_class = OnlineTaskR
+
+    def __init__(self, model):
+        Results.__init__(self, model)
+        self._handlers = []
+        self._owners = None
+
+    def register(self, trace):
+        if isinstance(trace, JobTrace):
+            self._handlers.append(self._job_event)
+        elif isinstance(trace, ProcessorTrace):
+            self._handlers.append(self._processor_event)
+        elif isinstance(trace, TimerTrace):
+            self._handlers.append(self._timer_event)
+        else:
+            self._handlers.append(self._scheduler_event)
+        return len(self._handlers) - 1
+
+    def _start(self):
+        self._new_tasks()
+        self._scheduler = SchedulerR()
+        self._scheduler_last = 0
+        self._processors = {}
+        self._timers = {}
+        self._total_timers = 0
+        # Date of the last event of each processor, its state, the time
+        # spent running and the time spent in overheads.
+        self._loads = {}
+        self._owners = {}
+        for proc in self.model.processors:
+            self._processors[proc] = ProcessorR()
+            self._timers[proc] = 0
+            self._loads[proc] = [0, ProcEvent.IDLE, 0, 0]
+            for trace in (proc.monitor, proc.timer_monitor):
+                if trace.enabled:
+                    self._owners[trace._number] = proc
+
+    def write(self, trace):
+        if self._owners is None:
+            self._start()
+        self._handlers[trace._number](trace)
+
+    def _job_event(self, trace):
+        trace._ids.pop()
+        cpu = trace._cpus.pop()
+        date = trace._dates.pop()
+        code = trace._codes.pop()
+        job = self.model.traced_job(trace._tasks.pop(), trace._jobs.pop(),
+                                    date)
+        if code == JobEvent.ACTIVATE:
+            # The previous jobs of the task that are finished are not
+            # needed anymore by the simulation.
+            job.task.free_finished_jobs()
+        self._add_task_event(
+            self._tasks[job.task], date, code, job,
+            self.model.processors[cpu] if cpu >= 0 else None)
+
+    def _scheduler_event(self, trace):
+        trace._jobs.pop()
+        trace._tasks.pop()
+        trace._cpus.pop()
+        date = trace._dates.pop()
+        self._scheduler.add_event(trace._codes.pop(),
+                                  date - self._scheduler_last)
+        self._scheduler_last = date
+
+    def _processor_event(self, trace):
+        trace._jobs.pop()
+        trace._tasks.pop()
+        trace._cpus.pop()
+        date = trace._dates.pop()
+        code = trace._codes.pop()
+        proc = self._owners[trace._number]
+        load = self._loads[proc]
+        duration = date - load[0]
+        self._processors[proc].add_event(code, duration)
+        if load[1] == ProcEvent.RUN:
+            load[2] += duration
+        elif load[1] == ProcEvent.OVERHEAD:
+            load[3] += duration
+        load[0] = date
+        load[1] = PROC_STATES[code]
+
+    def _timer_event(self, trace):
+        trace._dates.pop()
+        trace._codes.pop()
+        self._timers[self._owners[trace._number]] += 1
+        self._total_timers += 1
+
+    def columns(self, number, layout, buffers=None):
+        # The events are not kept: the traces are empty.
+        return buffers
+
+    def close(self):
+        pass
+
+    def end(self):
+        if self._owners is None:
+            self._start()
+
+    def _analyze(self, part):
+        pass
+
+    def _task_count(self, metric):
+        return sum(getattr(task_r, metric) for task_r in self.tasks.values())
+
+    @property
+    def extrapolated(self):
+        return False
+
+    def set_observation_window(self, window):
+        raise ValueError("The observation window of the online results "
+                         "cannot be changed.")
+
+    observation_window = property(Results.get_observation_window,
+                                  set_observation_window)
+
+    def tasks_event(self):
+        raise ValueError("The events of the tasks are not kept by the "
+                         "online results.")
+
+    def _timeline(self, proc):
+        raise ValueError("The events of the processors are not kept by the "
+                         "online results.")
+
+    def calc_load(self):
+        self._require(PROCESSORS, "loads of the processors")
+        w1 = self.observation_window[1]
+        duration = self.observation_window_duration
+        for proc in self.model.processors:
+            date, state, run, overhead = self._loads[proc]
+            if state == ProcEvent.RUN:
+                run += w1 - date
+            elif state == ProcEvent.OVERHEAD:
+                overhead += w1 - date
+            yield proc, float(run) / duration, float(overhead) / duration
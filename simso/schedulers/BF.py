@@ -5,6 +5,7 @@ Authors: Maxime Cheramy and Stefan Junker
 """
 from simso.schedulers import scheduler
 from simso.core import Scheduler, Timer
+from simso.core.Logger import WARNING
 from fractions import Fraction
 
 
@@ -89,7 +90,7 @@ class BF(Scheduler):
         mand = {}
         eligible = []
 
-        print("{:#^60}".format(
+        self.sim.logger.diagnostic("{:#^60}".format(
             " Scheduling Interval [{},{}) ".format(
                 self.sim.now() / self.sim.cycles_per_ms,
                 self.t_f / self.sim.cycles_per_ms)))
@@ -119,7 +120,7 @@ class BF(Scheduler):
             self.rw[task.identifier] = \
                 self.pw[task.identifier] * self.sim.cycles_per_ms
 
-        print("{:#^60}".format(" Done "))
+        self.sim.logger.diagnostic("{:#^60}".format(" Done "))
 
         while available >= self.sim.cycles_per_ms and eligible:
             task_m = eligible[0]
@@ -131,7 +132,9 @@ class BF(Scheduler):
                 elif result == 1:
                     task_m = task_e
                 else:
-                    print("Warning: Couldn't find task for optional unit!")
+                    self.sim.logger.log(
+                        "Warning: Couldn't find task for optional unit!",
+                        level=WARNING)
 
             mand[task_m.identifier] += self.sim.cycles_per_ms
             available -= self.sim.cycles_per_ms
@@ -165,8 +168,9 @@ class BF(Scheduler):
                     # Because every durations are rounded to the upper value,
                     # the last job may have not enough space left.
                     # This could probably be improved.
-                    print("Warning: didn't allowed enough time to %s (%d)." %
-                          (task.name, duration - duration1))
+                    self.sim.logger.log(
+                        "Warning: didn't allowed enough time to %s (%d)." %
+                        (task.name, duration - duration1), level=WARNING)
                     break
 
                 p += 1
@@ -3,6 +3,7 @@ Implementation of the DP-WRAP algorithm as presented by Levin et al. in
 "DP-FAIR: A Simple Model for Understanding Optimal Multiprocessor Scheduling".
 """
 from simso.core import Scheduler, Timer
+from simso.core.Logger import WARNING
 from math import ceil
 from simso.schedulers import scheduler
 
@@ -66,8 +67,9 @@ class DP_WRAP(Scheduler):
                     # Because every durations are rounded to the upper value,
                     # the last job may have not enough space left.
                     # This could probably be improved.
-                    print("Warning: didn't allowed enough time to last task.",
-                          duration - duration1)
+                    self.sim.logger.log(
+                        "Warning: didn't allowed enough time to last task. "
+                        "{}".format(duration - duration1), level=WARNING)
                     break
 
                 p += 1
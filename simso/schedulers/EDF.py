@@ -24,15 +24,17 @@ class EDF(Scheduler):
             # the one with the greatest deadline (self in case of equality):
             key = lambda x: (
                 1 if not x.running else 0,
-                x.running.absolute_deadline if x.running else 0,
+                x.running.absolute_deadline_cycles if x.running else 0,
                 1 if x is cpu else 0
             )
             cpu_min = max(self.processors, key=key)
 
             # Select the job with the least priority:
-            job = min(ready_jobs, key=lambda x: x.absolute_deadline)
+            job = min(ready_jobs, key=lambda x: x.absolute_deadline_cycles)
 
             if (cpu_min.running is None or
-                    cpu_min.running.absolute_deadline > job.absolute_deadline):
-                print(self.sim.now(), job.name, cpu_min.name)
+                    cpu_min.running.absolute_deadline_cycles >
+                    job.absolute_deadline_cycles):
+                self.sim.logger.diagnostic(self.sim.now(), job.name,
+                                           cpu_min.name)
                 return (job, cpu_min)
@@ -15,7 +15,7 @@ class EDZL(Scheduler):
         self.zl_timer = None
 
     def on_activate(self, job):
-        job.priority = job.absolute_deadline
+        job.priority = job.absolute_deadline_cycles
         self.ready_list.append(job)
         job.cpu.resched()
 
@@ -32,7 +32,7 @@ class EDZL(Scheduler):
             job.priority = 0
             job.cpu.resched()
         else:
-            print(self.sim.now(), job.name)
+            self.sim.logger.diagnostic(self.sim.now(), job.name)
 
     def schedule(self, cpu):
         """
@@ -2,14 +2,14 @@
 # coding=utf-8
 
 from simso.core.Scheduler import SchedulerInfo
-from simso.schedulers.EDF_mono import EDF_mono
 from simso.utils import PartitionedScheduler
 from simso.schedulers import scheduler
 
 @scheduler("simso.schedulers.Fixed_PEDF")
 class Fixed_PEDF(PartitionedScheduler):
     def init(self):
-        PartitionedScheduler.init(self, SchedulerInfo("EDF_mono", EDF_mono))
+        PartitionedScheduler.init(
+            self, SchedulerInfo("simso.schedulers.EDF_mono"))
 
     def packer(self):
         for task in self.task_list:
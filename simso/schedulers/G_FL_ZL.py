@@ -29,7 +29,7 @@ class G_FL_ZL(Scheduler):
             job.priority = 0
             job.cpu.resched()
         else:
-            print(self.sim.now(), job.name)
+            self.sim.logger.diagnostic(self.sim.now(), job.name)
 
     def schedule(self, cpu):
         """
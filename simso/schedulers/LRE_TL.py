@@ -46,7 +46,7 @@ class LRE_TL(Scheduler):
         decisions = []
 
         for task in self.activations:
-            dl = int(task.job.absolute_deadline * self.sim.cycles_per_ms)
+            dl = task.job.absolute_deadline_cycles
             if dl not in self.h_d:
                 heappush(self.h_d, dl)
 
@@ -95,7 +95,7 @@ class LRE_TL(Scheduler):
                     key_b, task_b = heapreplace(self.h_b, (self.t_f + l, task))
                     heappush(self.h_c, (self.t_f - key_b + self.sim.now()))
 
-        dl = int(task.job.absolute_deadline * self.sim.cycles_per_ms)
+        dl = task.job.absolute_deadline_cycles
         if dl not in self.h_d:
             heappush(self.h_d, dl)
 
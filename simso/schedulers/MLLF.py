@@ -25,7 +25,7 @@ class MLLF(Scheduler):
         if self.ready_list:
             # Sort according to the laxity.
             self.ready_list.sort(
-                key=lambda x: (x.laxity, x.absolute_deadline))
+                key=lambda x: (x.laxity, x.absolute_deadline_cycles))
 
             # m : Nombre de processeurs.
             m = len(self.processors)
@@ -36,8 +36,8 @@ class MLLF(Scheduler):
 
             if len(self.ready_list) > m:
                 ta = self.ready_list[m - 1]
-                dmin = self.ready_list[m].absolute_deadline * \
-                    self.sim.cycles_per_ms - self.sim.now()
+                dmin = (self.ready_list[m].absolute_deadline_cycles -
+                        self.sim.now())
 
                 if self.timer:
                     self.timer.stop()
@@ -45,7 +45,7 @@ class MLLF(Scheduler):
                     self.sim, MLLF.update,
                     (self, self.processors[0]), dmin - ta.laxity,
                     one_shot=True,
-                    cpu=self.processors[0])
+                    cpu=self.processors[0], in_ms=False)
                 self.timer.start()
 
             # The first m jobs should be running:
@@ -5,6 +5,7 @@ Use EDF_mono.
 """
 from simso.core import Scheduler
 from simso.core.Scheduler import SchedulerInfo
+from simso.core.Logger import WARNING
 from simso.schedulers.EDF_mono import EDF_mono
 from simso.schedulers import scheduler
 
@@ -36,7 +37,8 @@ class P_EDF2(Scheduler):
             while cpus[j][1] + float(task.wcet) / task.period > 1.0:
                 j += 1
                 if j >= len(self.processors):
-                    print("oops bin packing failed.")
+                    self.sim.logger.log("oops bin packing failed.",
+                                        level=WARNING)
                     return
 
             # Get the scheduler for this processor.
@@ -7,11 +7,16 @@ RUN is a global multiprocessors scheduler for periodic-preemptive-independent
 tasks with implicit deadlines.
 """
 
+from collections import namedtuple
 from simso.core import Scheduler, Timer
 from simso.schedulers.RUNServer import EDFServer, TaskServer, DualServer, \
     select_jobs, add_job, get_child_tasks
 from simso.schedulers import scheduler
 
+# pylint: disable-msg=C0103
+IdleTask = namedtuple('IdleTask', ['utilization'])
+
+
 @scheduler("simso.schedulers.RUN")
 class RUN(Scheduler):
     """
@@ -45,10 +50,6 @@ class RUN(Scheduler):
         """
         Create IdleTasks in order to reach 100% system utilization.
         """
-        from collections import namedtuple
-        # pylint: disable-msg=C0103
-        IdleTask = namedtuple('IdleTask', ['utilization'])
-
         idle = len(self.processors) - sum([s.utilization for s in servers])
         for server in servers:
             if server.utilization < 1 and idle > 0:
@@ -83,7 +83,8 @@ class SCHED_DEADLINE(Scheduler):
             if (cpu_min.running is None or
                         self.cbs_servers[cpu_min.running.task].current_deadline > self.cbs_servers[
                         job.task].current_deadline):
-                print(self.sim.now(), job.name, cpu_min.name)
+                self.sim.logger.diagnostic(self.sim.now(), job.name,
+                                           cpu_min.name)
 
                 # start runtime timer of the new server selected
                 self.cbs_servers[job.task].timer_runtime = Timer(self.sim, SCHED_DEADLINE.runtime_call,
@@ -1,4 +1,5 @@
 from simso.core import Scheduler
+from simso.core.Logger import WARNING
 
 
 def best_fit(scheduler, task_list=None):
@@ -17,7 +18,8 @@ def best_fit(scheduler, task_list=None):
         while cpus[j][1] * task.period + float(task.wcet) > task.period:
             j += 1
             if j >= len(scheduler.processors):
-                print("oops bin packing failed.")
+                scheduler.sim.logger.log("oops bin packing failed.",
+                                         level=WARNING)
                 return False
 
         # Affect it to the task.
@@ -48,7 +50,8 @@ def worst_fit(scheduler, task_list=None):
         while cpus[j][1] * task.period + float(task.wcet) > task.period:
             j += 1
             if j >= len(scheduler.processors):
-                print("oops bin packing failed.")
+                scheduler.sim.logger.log("oops bin packing failed.",
+                                         level=WARNING)
                 return False
 
         # Affect it to the task.
@@ -80,7 +83,8 @@ def next_fit(scheduler, task_list=None):
             j = (j + 1) % len(scheduler.processors)
             k += 1
             if k >= len(scheduler.processors):
-                print("oops bin packing failed.")
+                scheduler.sim.logger.log("oops bin packing failed.",
+                                         level=WARNING)
                 return False
 
         # Affect it to the task.
@@ -109,7 +113,8 @@ def first_fit(scheduler, task_list=None):
         while cpus[j][1] * task.period + float(task.wcet) > task.period:
             j += 1
             if j >= len(scheduler.processors):
-                print("oops bin packing failed.")
+                scheduler.sim.logger.log("oops bin packing failed.",
+                                         level=WARNING)
                 return False
 
         # Affect it to the task.